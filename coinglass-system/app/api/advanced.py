@@ -11,7 +11,7 @@ from app.core.coinglass_client import CoinglassClient
 def get_wib_time() -> datetime:
     """Get current time in WIB (UTC+7)"""
     return datetime.now(timezone.utc) + timedelta(hours=7)
-from app.core.sniper_engine import SniperTimingEngine
+from app.core.sniper_engine import get_sniper_timing_engine
 from app.core.http import HttpError, RateLimitExceeded
 from app.core.logging import logger
 from app.core.settings import settings
@@ -1311,7 +1311,7 @@ def get_sniper_timing_signals(
 ):
     """Get institutional-grade 5-minute LONG/SHORT sniper signals"""
     try:
-        engine = SniperTimingEngine()
+        engine = get_sniper_timing_engine()
         signal_data = engine.analyze_sniper_signals(coin.upper(), exchange)
         return signal_data
     except Exception as e:
@@ -1325,7 +1325,7 @@ def get_multi_coin_sniper_scan(
     """Scan multiple coins for best sniper timing opportunities"""
     try:
         coin_list = [coin.strip().upper() for coin in coins.split(",")]
-        engine = SniperTimingEngine()
+        engine = get_sniper_timing_engine()
         results = engine.multi_coin_scan(coin_list)
         
         return {
@@ -85,17 +85,17 @@ class ReplDBCacheManager:
             logger.warning(f"ReplDB set_many error: {e}")
             return False
     
-    def increment(self, key: str, amount: int = 1) -> int:
-        """Increment counter in cache"""
+    def increment(self, key: str, amount: int = 1, ttl: Optional[int] = None) -> int:
+        """Increment counter in cache (ttl applies to the stored counter, like INCR + EXPIRE)"""
         try:
             current_value = self.get(key, 0)
             if isinstance(current_value, (int, float)):
                 new_value = int(current_value + amount)  # Convert to int
-                self.set(key, new_value)
+                self.set(key, new_value, ttl)
                 return new_value
             else:
                 # Reset to amount if not numeric
-                self.set(key, amount)
+                self.set(key, amount, ttl)
                 return amount
         except Exception as e:
             logger.warning(f"ReplDB increment error for key {key}: {e}")
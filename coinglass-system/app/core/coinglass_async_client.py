@@ -7,6 +7,7 @@ Proper async HTTP client untuk whale detection dengan correct API parameters
 import os
 import asyncio
 import aiohttp
+import orjson
 from typing import Dict, List, Optional, Any
 import logging
 import json
@@ -14,6 +15,10 @@ from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pool limits (keep-alive reuse across all requests)
+CONNECTOR_LIMIT = 100
+CONNECTOR_LIMIT_PER_HOST = 10
+
 class AsyncCoinglassClient:
     """Async CoinGlass API client dengan correct parameters dan proper error handling"""
     
@@ -21,6 +26,7 @@ class AsyncCoinglassClient:
         self.api_key = os.getenv('COINGLASS_API_KEY')
         self.base_url = "https://open-api-v4.coinglass.com"
         self.session: Optional[aiohttp.ClientSession] = None
+        self.semaphore = asyncio.Semaphore(CONNECTOR_LIMIT_PER_HOST)  # Bound in-flight requests
         self.rate_limit_delay = 1.0  # Rate limiting between requests
         self.last_request_time = 0
         
@@ -36,7 +42,13 @@ class AsyncCoinglassClient:
                 'Accept': 'application/json',
                 'User-Agent': 'Enhanced-Sniper-Engine-V2/1.0'
             }
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTOR_LIMIT,
+                limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+                ttl_dns_cache=300
+            )
             self.session = aiohttp.ClientSession(
+                connector=connector,
                 timeout=timeout,
                 headers=headers
             )
@@ -63,24 +75,25 @@ class AsyncCoinglassClient:
             
             logger.debug(f"📡 CoinGlass request: {endpoint} with {clean_params}")
             
-            async with session.get(url, params=clean_params) as response:
-                self.last_request_time = datetime.now().timestamp()
-                
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('code') == '0':
-                        return data
+            async with self.semaphore:
+                async with session.get(url, params=clean_params) as response:
+                    self.last_request_time = datetime.now().timestamp()
+                    
+                    if response.status == 200:
+                        data = await response.json(loads=orjson.loads)
+                        if data.get('code') == '0':
+                            return data
+                        else:
+                            logger.warning(f"⚠️ CoinGlass API error: {data.get('msg', 'Unknown')}")
+                            return None
+                    elif response.status == 429:
+                        logger.warning("⏳ Rate limited, backing off...")
+                        await asyncio.sleep(2)
+                        return None
                     else:
-                        logger.warning(f"⚠️ CoinGlass API error: {data.get('msg', 'Unknown')}")
+                        error_text = await response.text()
+                        logger.error(f"❌ HTTP {response.status}: {error_text}")
                         return None
-                elif response.status == 429:
-                    logger.warning("⏳ Rate limited, backing off...")
-                    await asyncio.sleep(2)
-                    return None
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ HTTP {response.status}: {error_text}")
-                    return None
                     
         except asyncio.TimeoutError:
             logger.error(f"⏰ Timeout for {endpoint}")
@@ -132,6 +145,28 @@ class AsyncCoinglassClient:
         }
         return await self._make_request(endpoint, params)
     
+    async def get_liquidation_pair_history(self, symbol: str, exchange: str = 'Binance', interval: str = '1h', limit: Optional[int] = None) -> Optional[Dict]:
+        """Get pair liquidation history (PAIR-SPECIFIC)"""
+        endpoint = "/api/futures/liquidation/pair-history"
+        params = {
+            'symbol': symbol,
+            'exchange': exchange,
+            'interval': interval,
+            'limit': limit
+        }
+        return await self._make_request(endpoint, params)
+    
+    async def batch_fetch_liquidations(self, coins: List[str], interval: str = '1h', limit: int = 1) -> Dict[str, Optional[Dict]]:
+        """Fan out aggregated liquidation fetches for many coins over the shared connection pool"""
+        results = await asyncio.gather(
+            *(self.get_liquidation_aggregated(coin, interval, limit) for coin in coins),
+            return_exceptions=True
+        )
+        return {
+            coin: result if not isinstance(result, Exception) else None
+            for coin, result in zip(coins, results)
+        }
+    
     async def get_supported_pairs(self) -> Optional[List[str]]:
         """Get supported exchange pairs untuk validation"""
         endpoint = "/api/futures/supported-exchange-pairs"
@@ -4,6 +4,7 @@ from app.core.logging import logger
 from typing import Optional
 import time
 from collections import defaultdict, deque
+from functools import partial
 
 class CoinglassClient:
     def __init__(self):
@@ -14,7 +15,7 @@ class CoinglassClient:
         self.base_url = "https://open-api-v4.coinglass.com"
         
         # CIRCUIT BREAKER: Track failed endpoints to prevent excessive API calls
-        self.endpoint_failures = defaultdict(lambda: deque(maxlen=10))  # Last 10 requests per endpoint
+        self.endpoint_failures = defaultdict(partial(deque, maxlen=10))  # Last 10 requests per endpoint
         self.circuit_breaker_threshold = 7  # Break circuit if 7/10 requests fail
         self.circuit_breaker_reset_time = 300  # 5 minutes reset time
         
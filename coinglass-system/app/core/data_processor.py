@@ -1,12 +1,57 @@
 import asyncio
-import hashlib
+import math
+import time
+import numpy as np
+import pandas as pd
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from app.core.db import get_db, db_manager
+from app.core.db import engine, get_db, db_manager
 from app.core.cache import cache
 from app.core.logging import logger
 from app.core.settings import settings
+from app.models.schemas import LiquidationInput
+
+# Fixed heatmap price grid per symbol (USD per bucket)
+BUCKET_STEP = {
+    'BTC': 10.0,
+    'ETH': 1.0,
+    'SOL': 0.1,
+}
+
+def get_bucket_step(symbol: Optional[str], price: float) -> float:
+    """Bucket step for symbol, falling back to a log-spaced grid (~0.1% of price magnitude)"""
+    step = BUCKET_STEP.get(symbol)
+    if step is None:
+        step = 10.0 ** (math.floor(math.log10(price)) - 3)
+    return step
+
+# Severity tiers by USD value: (<=100K, <=1M, <=10M, >10M)
+SEVERITY_THRESHOLDS = np.array([100_000.0, 1_000_000.0, 10_000_000.0])
+SEVERITY_LABELS = np.array(['low', 'medium', 'high', 'critical'])
+
+def classify_severity(usd_values) -> np.ndarray:
+    """Map USD values to severity labels in one vectorized lookup"""
+    return SEVERITY_LABELS[np.searchsorted(SEVERITY_THRESHOLDS, np.asarray(usd_values, dtype=float))]
+
+LIQUIDATION_REQUIRED_FIELDS = ['symbol', 'side', 'price', 'qty']
+LIQUIDATION_KEY_FIELDS = ['symbol', 'timestamp', 'price', 'qty', 'side']
+
+INSERT_LIQUIDATION_SQL = text("""
+    INSERT INTO liquidations (ts, symbol, side, price, qty, exchange, bucket, meta)
+    VALUES (:ts, :symbol, :side, :price, :qty, :exchange, :bucket, :meta)
+    ON CONFLICT DO NOTHING
+""")
+
+# psycopg2 execute_values form: one multi-row VALUES statement per page
+INSERT_LIQUIDATION_VALUES_SQL = """
+    INSERT INTO liquidations (ts, symbol, side, price, qty, exchange, bucket, meta)
+    VALUES %s
+    ON CONFLICT DO NOTHING
+"""
 
 class DataProcessor:
     """Advanced data processing with validation, deduplication, and error recovery"""
@@ -14,50 +59,29 @@ class DataProcessor:
     def __init__(self):
         self.batch_size = settings.BATCH_SIZE
         self.max_retries = settings.MAX_RETRIES
-        self.processed_hashes = set()  # In-memory deduplication cache
-        
-    def generate_data_hash(self, data: Dict[str, Any]) -> str:
-        """Generate hash for data deduplication"""
-        # Create deterministic hash from key fields
-        key_fields = ['symbol', 'timestamp', 'price', 'qty', 'side']
-        hash_string = ""
+        self.processed_hashes: Dict[int, None] = {}  # Insertion-ordered dedup cache
+        self.flush_rows = settings.WRITER_FLUSH_ROWS
+        self.flush_interval = settings.WRITER_FLUSH_INTERVAL_MS / 1000.0
+        self.pending_liquidations: List[Dict[str, Any]] = []  # Group-commit buffer
+        self.last_flush = time.monotonic()
         
-        for field in key_fields:
-            if field in data:
-                hash_string += f"{field}:{data[field]}:"
-        
-        return hashlib.md5(hash_string.encode()).hexdigest()
+    def generate_data_hash(self, data: Dict[str, Any]) -> int:
+        """Generate 64-bit deduplication hash from the identifying fields"""
+        # Collision odds for 10k live entries in a 64-bit space are ~3e-12
+        return hash((
+            data.get('symbol'),
+            data.get('timestamp'),
+            data.get('price'),
+            data.get('qty'),
+            data.get('side'),
+        ))
     
     def validate_liquidation_data(self, data: Dict[str, Any]) -> bool:
         """Validate liquidation data structure"""
-        required_fields = ['symbol', 'side', 'price', 'qty']
-        
-        # Check required fields
-        for field in required_fields:
-            if field not in data:
-                logger.warning(f"Missing required field: {field}")
-                return False
-        
-        # Validate data types and ranges
         try:
-            price = float(data['price'])
-            qty = float(data['qty'])
-            
-            if price <= 0 or qty <= 0:
-                logger.warning(f"Invalid price or quantity: price={price}, qty={qty}")
-                return False
-            
-            if data['side'] not in ['long', 'short']:
-                logger.warning(f"Invalid side: {data['side']}")
-                return False
-            
-            # Symbol validation
-            if not isinstance(data['symbol'], str) or len(data['symbol']) < 2:
-                logger.warning(f"Invalid symbol: {data['symbol']}")
-                return False
-                
-        except (ValueError, TypeError) as e:
-            logger.warning(f"Data validation error: {e}")
+            LiquidationInput.model_validate(data)
+        except ValidationError as e:
+            logger.warning(f"Invalid liquidation data: {e.errors(include_url=False)}")
             return False
         
         return True
@@ -92,67 +116,120 @@ class DataProcessor:
             if data_hash not in seen_hashes and data_hash not in self.processed_hashes:
                 unique_data.append(data)
                 seen_hashes.add(data_hash)
-                self.processed_hashes.add(data_hash)
+                self.processed_hashes[data_hash] = None
         
-        # Cleanup old hashes (keep only last 10000)
-        if len(self.processed_hashes) > 10000:
-            self.processed_hashes = set(list(self.processed_hashes)[-5000:])
+        self._trim_processed_hashes()
         
         logger.debug(f"Deduplicated {len(data_list)} -> {len(unique_data)} records")
         return unique_data
     
+    def _trim_processed_hashes(self):
+        """Cleanup old hashes (keep only the newest 5000 once above 10000)"""
+        if len(self.processed_hashes) > 10000:
+            for old_hash in list(islice(self.processed_hashes, len(self.processed_hashes) - 5000)):
+                del self.processed_hashes[old_hash]
+    
+    def prepare_liquidation_batch(self, liquidations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate, deduplicate and enrich a liquidation batch in one columnar pass"""
+        if not liquidations:
+            return []
+        
+        df = pd.DataFrame.from_records(liquidations)
+        missing = [field for field in LIQUIDATION_REQUIRED_FIELDS if field not in df.columns]
+        if missing:
+            logger.warning(f"Missing required fields in liquidation batch: {missing}")
+            return []
+        
+        # Dedup keys from the raw values over the fixed key schema, so a row hashes the
+        # same whichever columns its batch has and the same as in generate_data_hash
+        keys = df.reindex(columns=LIQUIDATION_KEY_FIELDS).astype(object)
+        keys = keys.where(keys.notna(), None)
+        
+        # Validate: same rules as LiquidationInput, evaluated as column masks
+        df['price'] = pd.to_numeric(df['price'], errors='coerce')
+        df['qty'] = pd.to_numeric(df['qty'], errors='coerce')
+        valid = (
+            (df['price'] > 0)
+            & (df['qty'] > 0)
+            & df['side'].isin(['long', 'short'])
+            & df['symbol'].map(lambda symbol: isinstance(symbol, str) and len(symbol) >= 2).astype(bool)
+        )
+        rejected = len(df) - int(valid.sum())
+        if rejected:
+            logger.warning(f"Dropped {rejected} invalid liquidation records")
+        
+        # Deduplicate within the batch and against recently processed rows in one pass
+        fresh = np.zeros(len(df), dtype=bool)
+        for i, (is_valid, key) in enumerate(zip(valid.to_numpy(), keys.itertuples(index=False, name=None))):
+            if is_valid:
+                data_hash = hash(key)
+                if data_hash not in self.processed_hashes:
+                    self.processed_hashes[data_hash] = None
+                    fresh[i] = True
+        self._trim_processed_hashes()
+        df = df[fresh]
+        
+        if df.empty:
+            return []
+        
+        df = self._enrich_liquidation_frame(df)
+        return df.astype(object).where(df.notna(), None).to_dict('records')
+    
     async def process_liquidation_batch(self, liquidations: List[Dict[str, Any]]) -> bool:
         """Process batch of liquidation data with error recovery"""
         try:
-            # Validate and deduplicate
-            valid_liquidations = []
-            for liq in liquidations:
-                if self.validate_liquidation_data(liq):
-                    valid_liquidations.append(liq)
-            
-            unique_liquidations = self.deduplicate_data(valid_liquidations)
+            # Validate, deduplicate and enrich
+            unique_liquidations = self.prepare_liquidation_batch(liquidations)
             
             if not unique_liquidations:
+                await self.flush_liquidations_if_due()
                 return True
             
-            # Process in batches
-            for i in range(0, len(unique_liquidations), self.batch_size):
-                batch = unique_liquidations[i:i + self.batch_size]
-                await self._insert_liquidation_batch(batch)
+            # Buffer rows; commits happen every flush_rows rows or flush_interval seconds
+            self.pending_liquidations.extend(unique_liquidations)
+            logger.debug(f"Buffered {len(unique_liquidations)} liquidation records")
             
-            logger.info(f"Processed {len(unique_liquidations)} liquidation records")
+            await self.flush_liquidations_if_due()
             return True
             
         except Exception as e:
             logger.error(f"Failed to process liquidation batch: {e}")
             return False
     
+    async def flush_liquidations_if_due(self) -> bool:
+        """Flush the write buffer once it is large or old enough"""
+        if not self.pending_liquidations:
+            return False
+        
+        if (len(self.pending_liquidations) >= self.flush_rows
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            await self.flush_liquidations()
+            return True
+        return False
+    
+    async def flush_liquidations(self):
+        """Commit all buffered liquidations in a single transaction"""
+        pending, self.pending_liquidations = self.pending_liquidations, []
+        self.last_flush = time.monotonic()
+        
+        if pending:
+            try:
+                await self._insert_liquidation_batch(pending)
+            except Exception:
+                # Rows are already in processed_hashes, so a redelivery would be dropped;
+                # put them back ahead of anything buffered meanwhile for the next flush
+                self.pending_liquidations[:0] = pending
+                raise
+            logger.info(f"Processed {len(pending)} liquidation records")
+    
     async def _insert_liquidation_batch(self, batch: List[Dict[str, Any]]):
         """Insert liquidation batch with retry logic"""
+        loop = asyncio.get_running_loop()
+        
         for attempt in range(self.max_retries):
             try:
-                # Use raw SQL for better performance
-                from sqlalchemy import text
-                from app.core.db import engine
-                
-                query = text("""
-                    INSERT INTO liquidations (ts, symbol, side, price, qty, exchange, bucket, meta)
-                    VALUES (:ts, :symbol, :side, :price, :qty, :exchange, :bucket, :meta)
-                    ON CONFLICT DO NOTHING
-                """)
-                
-                with engine.begin() as conn:
-                    for record in batch:
-                        conn.execute(query, {
-                            'ts': record.get('timestamp', datetime.utcnow()),
-                            'symbol': record['symbol'],
-                            'side': record['side'],
-                            'price': record['price'],
-                            'qty': record['qty'],
-                            'exchange': record.get('exchange'),
-                            'bucket': record.get('bucket'),
-                            'meta': record.get('meta')
-                        })
+                # Blocking DB I/O runs in the default executor so the event loop keeps serving
+                await loop.run_in_executor(None, self._execute_liquidation_insert, batch)
                 return
                 
             except Exception as e:
@@ -161,6 +238,54 @@ class DataProcessor:
                     raise
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff
     
+    def _execute_liquidation_insert(self, batch: List[Dict[str, Any]]):
+        """Execute liquidation insert in a single transaction (blocking)"""
+        if engine.dialect.driver == 'psycopg2':
+            self._execute_liquidation_insert_raw(batch)
+            return
+        
+        rows = [self._liquidation_row(record) for record in batch]
+        
+        with engine.begin() as conn:
+            # Use raw SQL for better performance
+            for i in range(0, len(rows), self.batch_size):
+                conn.execute(INSERT_LIQUIDATION_SQL, rows[i:i + self.batch_size])
+    
+    def _execute_liquidation_insert_raw(self, batch: List[Dict[str, Any]]):
+        """Bulk insert on the raw psycopg2 connection (no SQLAlchemy per-statement overhead)"""
+        from psycopg2.extras import Json, execute_values
+        
+        rows = []
+        for record in batch:
+            row = self._liquidation_row(record)
+            if row['meta'] is not None:
+                row['meta'] = Json(row['meta'])
+            rows.append(tuple(row.values()))
+        
+        conn = engine.raw_connection()
+        try:
+            with conn.cursor() as cursor:
+                execute_values(cursor, INSERT_LIQUIDATION_VALUES_SQL, rows, page_size=self.batch_size)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    def _liquidation_row(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a processed liquidation record to liquidations table columns"""
+        return {
+            'ts': record.get('timestamp') or datetime.utcnow(),
+            'symbol': record['symbol'],
+            'side': record['side'],
+            'price': record['price'],
+            'qty': record['qty'],
+            'exchange': record.get('exchange'),
+            'bucket': record.get('bucket'),
+            'meta': record.get('meta')
+        }
+    
     def enrich_data(self, data: Dict[str, Any], data_type: str) -> Dict[str, Any]:
         """Enrich data with additional calculated fields"""
         enriched = data.copy()
@@ -170,26 +295,43 @@ class DataProcessor:
             if 'price' in data and 'qty' in data:
                 enriched['usd_value'] = float(data['price']) * float(data['qty'])
             
-            # Add bucket for heatmap
+            # Add bucket for heatmap (fixed grid so nearby prices share a bucket)
             if 'price' in data:
                 price = float(data['price'])
-                # Create price buckets (100 buckets)
-                bucket_size = price * 0.001  # 0.1% buckets
-                enriched['bucket'] = round(price / bucket_size) * bucket_size
+                if price > 0:
+                    step = get_bucket_step(data.get('symbol'), price)
+                    enriched['bucket'] = (price // step) * step
             
             # Add severity classification
             if 'usd_value' in enriched:
-                usd_value = enriched['usd_value']
-                if usd_value > 10000000:  # > $10M
-                    enriched['severity'] = 'critical'
-                elif usd_value > 1000000:  # > $1M
-                    enriched['severity'] = 'high'
-                elif usd_value > 100000:  # > $100K
-                    enriched['severity'] = 'medium'
-                else:
-                    enriched['severity'] = 'low'
+                enriched['severity'] = str(classify_severity(enriched['usd_value']))
         
         return enriched
+    
+    def enrich_liquidation_batch(self, liquidations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Enrich a validated liquidation batch with column-wise operations"""
+        if not liquidations:
+            return []
+        
+        df = self._enrich_liquidation_frame(pd.DataFrame.from_records(liquidations))
+        return df.astype(object).where(df.notna(), None).to_dict('records')
+    
+    def _enrich_liquidation_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add usd_value, bucket and severity columns"""
+        prices = pd.to_numeric(df['price']).to_numpy(dtype=float)
+        qtys = pd.to_numeric(df['qty']).to_numpy(dtype=float)
+        
+        # Per-symbol grid, log-spaced fallback (see get_bucket_step)
+        steps = df['symbol'].map(BUCKET_STEP).to_numpy(dtype=float, copy=True)
+        fallback = np.isnan(steps)
+        steps[fallback] = 10.0 ** (np.floor(np.log10(prices[fallback])) - 3)
+        
+        usd_values = prices * qtys
+        return df.assign(
+            usd_value=usd_values,
+            bucket=(prices // steps) * steps,
+            severity=classify_severity(usd_values)
+        )
 
 class DataQualityMonitor:
     """Monitor data quality and alert on issues"""
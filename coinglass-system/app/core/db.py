@@ -4,23 +4,41 @@ from sqlalchemy.pool import QueuePool
 from app.core.settings import settings
 from app.core.logging import logger
 from db.base import Base
+from functools import lru_cache
 import time
 
-# Enhanced database engine with performance optimizations
-engine = create_engine(
-    settings.DB_URL,
-    poolclass=QueuePool,
-    pool_size=settings.DB_POOL_SIZE,
-    max_overflow=settings.DB_MAX_OVERFLOW,
-    pool_pre_ping=settings.DB_POOL_PRE_PING,
-    pool_recycle=settings.DB_POOL_RECYCLE,
-    echo=False,  # Set to True for SQL debugging
-    connect_args={
+def _connect_args() -> dict:
+    """Driver connect arguments for the configured DB_URL"""
+    if not settings.DB_URL.startswith('postgresql'):
+        return {}
+    
+    connect_args = {
         "connect_timeout": 10,
         "options": "-c statement_timeout=30000",  # 30 seconds timeout (psycopg2 compatible)
         "application_name": "coinglass_system"
-    } if settings.DB_URL.startswith('postgresql') else {}
-)
+    }
+    # psycopg 3 can reuse server-side prepared statements for repeated queries (psycopg2 cannot)
+    if settings.DB_URL.startswith('postgresql+psycopg:'):
+        connect_args["prepare_threshold"] = settings.DB_PREPARE_THRESHOLD
+    return connect_args
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """Process-wide database engine (one connection pool per process)"""
+    # Enhanced database engine with performance optimizations
+    return create_engine(
+        settings.DB_URL,
+        poolclass=QueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,  # Compiled statement cache
+        echo=False,  # Set to True for SQL debugging
+        connect_args=_connect_args()
+    )
+
+engine = get_engine()
 
 SessionLocal = sessionmaker(
     bind=engine, 
@@ -29,16 +47,18 @@ SessionLocal = sessionmaker(
     expire_on_commit=False
 )
 
-# Database performance monitoring
-@event.listens_for(engine, "before_cursor_execute")
+# Database performance monitoring (opt-in: adds two timer calls per statement)
 def receive_before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    context._query_start_time = time.time()
+    context._query_start_time = time.perf_counter()
 
-@event.listens_for(engine, "after_cursor_execute")
 def receive_after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
-    total = time.time() - context._query_start_time
-    if total > 1.0:  # Log slow queries (>1 second)
-        logger.warning(f"Slow query detected: {total:.2f}s - {statement[:100]}")
+    total = time.perf_counter() - context._query_start_time
+    if total > settings.DB_SLOW_QUERY_SECONDS:
+        logger.warning("Slow query detected: %.2fs - %s", total, statement[:100])
+
+if settings.DB_SLOW_QUERY_LOGGING:
+    event.listen(engine, "before_cursor_execute", receive_before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", receive_after_cursor_execute)
 
 def get_db():
     """Dependency to get database session"""
@@ -1,22 +1,77 @@
-import json
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, List
 from app.core.cache import redis_client
+from app.core.logging import logger
+
+# redis_client is the ReplDB-backed cache manager: a key/value store without
+# Redis list commands. Each queue is one JSON list stored under its name, and
+# the read-modify-write is serialized here. Producers (WebSocket feed threads)
+# and the drain job run in the same scheduler process, so this condition also
+# wakes a waiting consumer as soon as items are pushed.
+_queue_condition = threading.Condition()
+QUEUE_TTL_SECONDS = 86400  # Only expires if nothing touches the queue for a day
+QUEUE_MAX_LENGTH = 10000  # Every push rewrites the whole list, so keep it bounded
 
 class DataQueue:
-    def __init__(self, queue_name: str):
+    def __init__(self, queue_name: str, max_length: int = QUEUE_MAX_LENGTH):
         self.queue_name = queue_name
+        self.max_length = max_length
+
+    def _load(self) -> List[Dict[str, Any]]:
+        items = redis_client.get(self.queue_name)
+        return items if isinstance(items, list) else []
+
+    def _store(self, items: List[Dict[str, Any]]):
+        if not items:
+            redis_client.delete(self.queue_name)
+        elif not redis_client.set(self.queue_name, items, ttl=QUEUE_TTL_SECONDS):
+            raise RuntimeError(f"Failed to store queue {self.queue_name}")
 
     def push(self, data: Dict[str, Any]):
-        redis_client.lpush(self.queue_name, json.dumps(data))
+        self.push_many([data])
+
+    def push_many(self, items: List[Dict[str, Any]]):
+        """Append items with one read/write of the stored list (FIFO), dropping the oldest past max_length"""
+        if not items:
+            return
+        with _queue_condition:
+            queued = self._load()
+            queued.extend(items)
+            overflow = len(queued) - self.max_length
+            if overflow > 0:
+                logger.warning(f"Queue {self.queue_name} full, dropped {overflow} oldest items")
+                del queued[:overflow]
+            self._store(queued)
+            _queue_condition.notify_all()
 
     def pop(self) -> Dict[str, Any] | None:
-        result = redis_client.brpop(self.queue_name, timeout=1)
-        if result:
-            return json.loads(result[1])
-        return None
+        items = self.pop_batch(1)
+        return items[0] if items else None
+
+    def pop_batch(self, n: int = 100, timeout: float = 1) -> List[Dict[str, Any]]:
+        """Wait up to timeout seconds for items, then take up to n oldest in one read/write"""
+        deadline = time.monotonic() + timeout
+        with _queue_condition:
+            queued = self._load()
+            while not queued:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                _queue_condition.wait(remaining)
+                queued = self._load()
+
+            self._store(queued[n:])
+            return queued[:n]
+
+    def drain(self, count: int = 500, timeout: float = 1) -> List[Dict[str, Any]]:
+        """Pop up to count items for batch processing"""
+        return self.pop_batch(count, timeout)
 
     def size(self) -> int:
-        return redis_client.llen(self.queue_name)
+        with _queue_condition:
+            return len(self._load())
 
     def clear(self):
-        redis_client.delete(self.queue_name)
\ No newline at end of file
+        with _queue_condition:
+            redis_client.delete(self.queue_name)
@@ -2,195 +2,585 @@
 Enhanced Sniper Engine - Rolling Percentile & Adaptive Thresholds
 CoinGlass API v4 Standard Package Compatible
 """
+import functools
 import json
+import math
+import random
+import sys
+import threading
+import time
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Tuple, Optional, Any, Mapping
 from datetime import datetime, timedelta
 import asyncio
 import logging
 from dataclasses import dataclass
+from enum import IntEnum
+from bisect import bisect_left, bisect_right, insort
 from collections import defaultdict, deque
+from cachetools import LRUCache
 
 from app.core.logging import logger
 from app.core.coinglass_client import CoinglassClient
 
-@dataclass
+class Level(IntEnum):
+    """Signal level; ordered so levels compare and count as small ints"""
+    NONE = 0
+    WATCH = 1
+    ACTION = 2
+    
+    @property
+    def label(self) -> str:
+        """Lowercase name for logs and JSON ("none", "watch", "action")"""
+        return self.name.lower()
+
+@dataclass(slots=True, frozen=True)
 class LayerSignal:
     """Individual layer signal result"""
     name: str
-    level: str  # "none", "watch", "action"
+    level: Level
     value: float
     threshold_used: float
     percentile_used: Optional[float] = None
     z_score: Optional[float] = None
     timestamp: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConfluenceResult:
     """Final confluence analysis result"""
-    overall_level: str  # "none", "watch", "action"
+    overall_level: Level
     layers_triggered: List[LayerSignal]
     confluence_score: float
     kill_switch_active: bool = False
     timestamp: Optional[datetime] = None
 
+@dataclass(slots=True, frozen=True)
+class LayerCfg:
+    """Per-layer thresholds pre-converted from the JSON config"""
+    window_size: int = 720
+    p_watch: Optional[int] = None
+    p_action: Optional[int] = None
+    abs_watch: Tuple[float, ...] = ()   # taker (high, low) band, funding (bps,)
+    abs_action: Tuple[float, ...] = ()
+    mult_watch: float = 0.0
+    mult_action: float = 0.0
+    p_action_90d: Optional[int] = None
+    abs_bounds: Tuple[float, ...] = ()  # abs bands flattened into classify_level argument order
+
+# Column order of the batched layer analysis
+BATCH_LAYERS = ("taker_ratio", "funding", "liquidation", "etf_flows")
+
+# Max concurrent CoinGlass requests in flight for batch scans
+BATCH_FETCH_CONCURRENCY = 16
+
+# Lookback period to number of hourly data points
+LOOKBACK_WINDOWS = {
+    "7d": 168,    # 7 days * 24 hours
+    "30d": 720,   # 30 days * 24 hours
+    "60d": 1440,  # 60 days * 24 hours
+    "90d": 2160   # 90 days * 24 hours
+}
+DEFAULT_WINDOW_SIZE = LOOKBACK_WINDOWS["30d"]
+
+def classify_level(value: float, watch: Optional[float], action: Optional[float],
+                   watch_lo: Optional[float] = None, action_lo: Optional[float] = None) -> int:
+    """Level code (0=none, 1=watch, 2=action) of value against watch/action thresholds
+    
+    A rung fires at value >= threshold, or value <= its *_lo bound when one is
+    given; a falsy threshold (percentile not available yet) skips the rung.
+    """
+    if action and (value >= action or (action_lo is not None and value <= action_lo)):
+        return 2
+    if watch and (value >= watch or (watch_lo is not None and value <= watch_lo)):
+        return 1
+    return 0
+
+@functools.lru_cache(maxsize=4)
+def _load_config(path: str) -> Mapping[str, Any]:
+    """Parse a sniper config file once per path (read-only view)"""
+    with open(path, 'r') as f:
+        return MappingProxyType(json.load(f))
+
+def _abs_band(value: Any) -> Tuple[float, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return tuple(float(v) for v in value)
+    return (float(value),)
+
+def build_layer_cfgs(layers: Dict[str, Dict[str, Any]]) -> Dict[str, LayerCfg]:
+    """Freeze the config 'layers' section into LayerCfg objects"""
+    cfgs = {}
+    for name, layer in layers.items():
+        abs_watch = _abs_band(layer.get('abs_watch', layer.get('abs_per_8h_watch_bps')))
+        abs_action = _abs_band(layer.get('abs_action', layer.get('abs_per_8h_action_bps')))
+        # (watch, action[, watch_lo, action_lo]) for classify_level(value, *abs_bounds)
+        abs_bounds = tuple(b for pair in zip(abs_watch, abs_action) for b in pair)
+        cfgs[name] = LayerCfg(
+            window_size=LOOKBACK_WINDOWS.get(layer.get('lookback', '30d'), DEFAULT_WINDOW_SIZE),
+            p_watch=layer.get('p_watch'),
+            p_action=layer.get('p_action'),
+            abs_watch=abs_watch,
+            abs_action=abs_action,
+            mult_watch=float(layer.get('mult_watch', 0.0)),
+            mult_action=float(layer.get('mult_action', 0.0)),
+            p_action_90d=layer.get('p_action_90d'),
+            abs_bounds=abs_bounds
+        )
+    return cfgs
+
+class RingBuffer:
+    """Fixed-size circular float64 buffer backing a rolling window"""
+    
+    __slots__ = ("buf", "size", "n", "head")
+    
+    def __init__(self, size: int):
+        self.buf = np.empty(size, dtype=np.float64)
+        self.size = size
+        self.n = 0
+        self.head = 0
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def add(self, value: float) -> Optional[float]:
+        """Write value at head, returning the value it overwrote once the buffer is full"""
+        evicted = float(self.buf[self.head]) if self.n == self.size else None
+        self.buf[self.head] = value
+        self.head = (self.head + 1) % self.size
+        if self.n < self.size:
+            self.n += 1
+        return evicted
+    
+    def view(self) -> np.ndarray:
+        """Filled part of the buffer (storage order, not insertion order)"""
+        return self.buf[:self.n]
+
+class RollingWindow(RingBuffer):
+    """Ring buffer plus the sorted copy and running sums derived from it
+    
+    The sums are taken of (value - shift) to limit cancellation on large
+    USD values, and are recomputed exactly from the buffer once per window
+    cycle so incremental rounding error cannot build up.
+    """
+    
+    __slots__ = ("sorted_values", "keep_sorted", "shift", "sum", "sumsq", "inserts")
+    
+    def __init__(self, size: int, keep_sorted: bool = True):
+        super().__init__(size)
+        self.sorted_values: List[float] = []  # same points in sorted order for percentile lookup
+        self.keep_sorted = keep_sorted
+        self.shift = 0.0
+        self.sum = 0.0    # running sum / sum of squares of shifted values for O(1) mean and std
+        self.sumsq = 0.0
+        self.inserts = 0  # inserts since the last exact recompute
+    
+    def add(self, value: float) -> Optional[float]:
+        if self.n == 0:
+            self.shift = value
+        evicted = super().add(value)
+        if self.keep_sorted:
+            insort(self.sorted_values, value)
+        d = value - self.shift
+        self.sum += d
+        self.sumsq += d * d
+        
+        if evicted is not None:
+            if self.keep_sorted:
+                del self.sorted_values[bisect_left(self.sorted_values, evicted)]
+            d = evicted - self.shift
+            self.sum -= d
+            self.sumsq -= d * d
+        
+        self.inserts += 1
+        if self.inserts >= self.size:
+            self._resync()
+        return evicted
+    
+    def _resync(self):
+        """Recompute the sums exactly, re-centring the shift on the current mean"""
+        data = self.view()
+        self.shift = float(data.mean())
+        dev = data - self.shift
+        self.sum = float(dev.sum())
+        self.sumsq = float(np.dot(dev, dev))
+        self.inserts = 0
+    
+    def mean(self) -> float:
+        return self.shift + self.sum / self.n
+    
+    def variance(self) -> float:
+        """Population variance (ddof=0, as np.var)"""
+        m = self.sum / self.n
+        return max(0.0, self.sumsq / self.n - m * m)
+    
+    def std(self) -> float:
+        return math.sqrt(self.variance())
+
+class P2Quantile:
+    """P² streaming estimate of a single quantile (Jain & Chlamtac, 1985)
+    
+    Five markers track the min, max, the quantile and two midpoints; each
+    sample costs O(1) and memory is constant.
+    """
+    
+    __slots__ = ("p", "count", "q", "pos", "desired", "incr")
+    
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.q: List[float] = []  # marker heights
+        self.pos = [1, 2, 3, 4, 5]  # actual marker positions
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.incr = [0, p / 2, p, (1 + p) / 2, 1]
+    
+    def add(self, x: float):
+        self.count += 1
+        q, pos = self.q, self.pos
+        if self.count <= 5:
+            insort(q, x)
+            return
+        
+        # Cell containing x, stretching the extremes if needed
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = bisect_right(q, x) - 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            self.desired[i] += self.incr[i]
+        
+        # Nudge the middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = self.desired[i] - pos[i]
+            if (d >= 1 and pos[i + 1] - pos[i] > 1) or (d <= -1 and pos[i - 1] - pos[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = q[i] + step / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + step) * (q[i + 1] - q[i]) / (pos[i + 1] - pos[i]) +
+                    (pos[i + 1] - pos[i] - step) * (q[i] - q[i - 1]) / (pos[i] - pos[i - 1])
+                )
+                if not q[i - 1] < candidate < q[i + 1]:
+                    # Parabolic step would break monotonicity; fall back to linear
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (pos[i + step] - pos[i])
+                q[i] = candidate
+                pos[i] += step
+    
+    def value(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        if self.count <= 5:
+            # Too few samples for markers: interpolate the exact order statistics
+            rank = (len(self.q) - 1) * self.p
+            lower = math.floor(rank)
+            upper = min(lower + 1, len(self.q) - 1)
+            return self.q[lower] + (rank - lower) * (self.q[upper] - self.q[lower])
+        return self.q[2]
+
+class RollingP2Quantile:
+    """P² estimate over roughly the last window of samples
+    
+    A second estimator starts halfway through each cycle and takes over when
+    the active one has seen a full window, so the estimate always covers
+    between window/2 and window of the most recent samples.
+    """
+    
+    __slots__ = ("p", "window", "active", "warming")
+    
+    def __init__(self, p: float, window: int):
+        self.p = p
+        self.window = window
+        self.active = P2Quantile(p)
+        self.warming: Optional[P2Quantile] = None
+    
+    def add(self, x: float):
+        self.active.add(x)
+        if self.warming is not None:
+            self.warming.add(x)
+        if self.active.count >= self.window:
+            self.active, self.warming = self.warming or P2Quantile(self.p), None
+        elif self.warming is None and self.active.count >= self.window // 2:
+            self.warming = P2Quantile(self.p)
+    
+    def value(self) -> Optional[float]:
+        return self.active.value()
+
 class RollingPercentileEngine:
-    """Adaptive rolling percentile calculator for all metrics"""
+    """Adaptive rolling percentile calculator for all metrics
     
-    def __init__(self, config_path: str = "enhanced-sniper-config.json"):
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+    Percentiles are exact by default. With "percentile_estimator": "p2" in the
+    config, each layer's configured percentiles are tracked with O(1) P²
+    estimators instead of a sorted window; other percentiles return None.
+    """
+    
+    def __init__(self, config: Optional[Mapping[str, Any]] = None,
+                 config_path: str = "enhanced-sniper-config.json"):
+        self.config = config if config is not None else _load_config(config_path)
+        
+        # Per-layer config and window sizes resolved once
+        self._layer_cfgs = build_layer_cfgs(self.config['layers'])
+        self._window_sizes: Dict[str, int] = {name: cfg.window_size for name, cfg in self._layer_cfgs.items()}
         
         # Historical data storage with rolling windows
-        self.historical_data: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(deque))
+        self.historical_data: Dict[str, RollingWindow] = {}
+        
+        # Optional approximate percentiles: key -> {percentile: estimator}
+        self.approximate = self.config.get('percentile_estimator', 'exact') == 'p2'
+        self._p2: Dict[str, Dict[int, RollingP2Quantile]] = {}
+        
+        # ETF flow moving average maintained as a running sum
+        self.etf_ma_window = self.config['layers'].get('etf_flows', {}).get('ma_window', 7)
+        self._etf_ma_values: Dict[str, deque] = defaultdict(functools.partial(deque, maxlen=self.etf_ma_window))
+        self._etf_ma_sum: Dict[str, float] = defaultdict(float)
         
-        # Percentile cache to avoid recalculation
-        self.percentile_cache: Dict[str, Dict[str, Tuple[float, datetime]]] = defaultdict(dict)
-        self.cache_ttl = timedelta(minutes=15)  # Cache for 15 minutes
+        # Percentile cache to avoid recalculation; idle keys age out of the LRU.
+        # Entries are {percentile: (value, monotonic expiry ns, lower, upper)}
+        self.percentile_cache: LRUCache = LRUCache(maxsize=512)
+        self.cache_ttl_ns = 15 * 60 * 1_000_000_000  # Cache for 15 minutes
+        
+        # Interned composite keys, built once per (metric, symbol)
+        self._keys: Dict[Tuple[str, str], str] = {}
         
         self.client = CoinglassClient()
     
+    def _key(self, metric_name: str, symbol: str) -> str:
+        """Interned "{metric}_{symbol}" storage key"""
+        try:
+            return self._keys[(metric_name, symbol)]
+        except KeyError:
+            key = self._keys[(metric_name, symbol)] = sys.intern(f"{metric_name}_{symbol}")
+            return key
+    
     def _get_window_size(self, lookback: str) -> int:
         """Convert lookback period to number of data points"""
-        period_map = {
-            "7d": 168,    # 7 days * 24 hours
-            "30d": 720,   # 30 days * 24 hours
-            "60d": 1440,  # 60 days * 24 hours
-            "90d": 2160   # 90 days * 24 hours
-        }
-        return period_map.get(lookback, 720)  # Default 30d
+        return LOOKBACK_WINDOWS.get(lookback, DEFAULT_WINDOW_SIZE)  # Default 30d
     
     def add_data_point(self, metric_name: str, symbol: str, value: float):
         """Add new data point to rolling window"""
-        key = f"{metric_name}_{symbol}"
-        window_size = self._get_window_size(
-            self.config['layers'].get(metric_name, {}).get('lookback', '30d')
-        )
+        key = self._key(metric_name, symbol)
         
-        # Add to rolling window
-        data_queue = self.historical_data[key]['values']
-        data_queue.append(value)
+        # Add to rolling window, overwriting the oldest point once full
+        window = self.historical_data.get(key)
+        if window is None:
+            window = self.historical_data[key] = RollingWindow(
+                self._window_sizes.get(metric_name, DEFAULT_WINDOW_SIZE), keep_sorted=not self.approximate
+            )
+        evicted = window.add(value)
+        
+        if self.approximate:
+            estimators = self._p2.get(key)
+            if estimators is None:
+                estimators = self._p2[key] = self._make_p2_estimators(metric_name, window.size)
+            for estimator in estimators.values():
+                estimator.add(value)
         
-        # Maintain window size
-        if len(data_queue) > window_size:
-            data_queue.popleft()
+        if metric_name == "etf_flows":
+            ma_values = self._etf_ma_values[symbol]
+            ma_evicted = ma_values[0] if len(ma_values) == self.etf_ma_window else 0.0
+            ma_values.append(value)
+            self._etf_ma_sum[symbol] += value - ma_evicted
         
-        # Clear percentile cache when new data arrives
-        if key in self.percentile_cache:
-            del self.percentile_cache[key]
+        # Drop cached percentiles the new point can move
+        entries = self.percentile_cache.get(key)
+        if entries:
+            if evicted is None:
+                # Window still filling: every rank shifts
+                del self.percentile_cache[key]
+            else:
+                # Full window: a percentile only stays put when the inserted and
+                # evicted points both fall strictly on one side of its bracket
+                for percentile, (_, _, lower, upper) in list(entries.items()):
+                    if not ((value > upper and evicted > upper) or (value < lower and evicted < lower)):
+                        del entries[percentile]
+    
+    def _make_p2_estimators(self, metric_name: str, window_size: int) -> Dict[int, RollingP2Quantile]:
+        """P² estimators for the percentiles the metric's layer config uses"""
+        cfg = self._layer_cfgs.get(metric_name, LayerCfg())
+        percentiles = {p for p in (cfg.p_watch, cfg.p_action, cfg.p_action_90d) if p is not None}
+        return {p: RollingP2Quantile(p / 100.0, window_size) for p in percentiles}
     
     def calculate_percentile(self, metric_name: str, symbol: str, percentile: int) -> Optional[float]:
         """Calculate rolling percentile with caching"""
-        key = f"{metric_name}_{symbol}"
-        cache_key = f"p{percentile}"
+        key = self._key(metric_name, symbol)
+        
+        if self.approximate:
+            window = self.historical_data.get(key)
+            estimator = self._p2.get(key, {}).get(percentile)
+            if window is None or len(window) < 20 or estimator is None:
+                return None
+            return estimator.value()
         
         # Check cache first
-        if (cache_key in self.percentile_cache[key] and 
-            datetime.now() - self.percentile_cache[key][cache_key][1] < self.cache_ttl):
-            return self.percentile_cache[key][cache_key][0]
+        entries = self.percentile_cache.get(key)
+        now_ns = time.monotonic_ns()
+        if entries is not None:
+            cached = entries.get(percentile)
+            if cached is not None and now_ns < cached[1]:
+                return cached[0]
         
         # Calculate if enough data points
-        data_queue = self.historical_data[key]['values']
-        if len(data_queue) < 20:  # Need minimum data points
+        window = self.historical_data.get(key)
+        if window is None or len(window) < 20:  # Need minimum data points
             return None
+        sorted_window = window.sorted_values
         
-        # Calculate percentile
-        values = list(data_queue)
-        result = float(np.percentile(values, percentile))
+        # Calculate percentile (linear interpolation, same as np.percentile)
+        rank = (len(sorted_window) - 1) * percentile / 100.0
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(sorted_window) - 1)
+        result = float(sorted_window[lower] + (rank - lower) * (sorted_window[upper] - sorted_window[lower]))
         
-        # Cache result
-        self.percentile_cache[key][cache_key] = (result, datetime.now())
+        # Cache result with the order statistics it was interpolated from
+        if entries is None:
+            entries = self.percentile_cache[key] = {}
+        # Jitter the TTL (±25%) so entries warmed together don't all expire together
+        expiry_ns = now_ns + int(self.cache_ttl_ns * random.uniform(0.75, 1.25))
+        entries[percentile] = (result, expiry_ns, sorted_window[lower], sorted_window[upper])
         
         return result
     
-    def calculate_z_score(self, metric_name: str, symbol: str, current_value: float) -> Optional[float]:
-        """Calculate z-score for institutional bias"""
-        key = f"{metric_name}_{symbol}"
-        data_queue = self.historical_data[key]['values']
-        
-        if len(data_queue) < 20:
+    def etf_moving_average(self, symbol: str) -> Optional[float]:
+        """ETF flow moving average over ma_window points (None until the window fills)"""
+        if len(self._etf_ma_values[symbol]) < self.etf_ma_window:
             return None
+        return self._etf_ma_sum[symbol] / self.etf_ma_window
+    
+    def z_score_squared(self, metric_name: str, symbol: str, current_value: float) -> Optional[float]:
+        """Squared z-score; compare against threshold ** 2 to skip the sqrt"""
+        window = self.historical_data.get(self._key(metric_name, symbol))
         
-        values = list(data_queue)
-        mean = np.mean(values)
-        std = np.std(values)
+        if window is None or len(window) < 20:
+            return None
         
-        if std == 0:
+        variance = window.variance()
+        if variance == 0:
             return 0
         
-        return float(abs(current_value - mean) / std)
+        deviation = current_value - window.mean()
+        return deviation * deviation / variance
+    
+    def calculate_z_score(self, metric_name: str, symbol: str, current_value: float) -> Optional[float]:
+        """Calculate z-score for institutional bias"""
+        z_squared = self.z_score_squared(metric_name, symbol, current_value)
+        return None if z_squared is None else math.sqrt(z_squared)
 
 class EnhancedSniperEngine:
     """Main Enhanced Sniper Engine with Confluence Logic"""
     
     def __init__(self, config_path: str = "enhanced-sniper-config.json"):
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+        self.config = _load_config(config_path)
         
-        self.percentile_engine = RollingPercentileEngine(config_path)
+        self.percentile_engine = RollingPercentileEngine(self.config)
         self.client = CoinglassClient()
         
+        # Frozen per-layer thresholds
+        self._layer_cfgs = build_layer_cfgs(self.config['layers'])
+        self.cfg_taker = self._layer_cfgs['taker_ratio']
+        self.cfg_funding = self._layer_cfgs['funding']
+        self.cfg_liquidation = self._layer_cfgs['liquidation']
+        self.cfg_etf = self._layer_cfgs['etf_flows']
+        
         # Kill-switch state
         self.kill_switch_active = False
         self.kill_switch_until = None
         
         logger.info("🎯 Enhanced Sniper Engine initialized with rolling percentile")
     
-    async def analyze_taker_ratio(self, symbol: str) -> LayerSignal:
+    @staticmethod
+    def _has_rows(data: Optional[Dict]) -> bool:
+        return bool(data and 'data' in data and data['data'])
+    
+    @staticmethod
+    def _parse_taker_ratio(data: Dict) -> float:
+        """Taker ratio: buy / max(1, sell)"""
+        latest = data['data'][0]
+        buy_volume = float(latest.get('aggregated_buy_volume_usd', 0))
+        sell_volume = float(latest.get('aggregated_sell_volume_usd', 1))  # Avoid division by zero
+        return buy_volume / max(1, sell_volume)
+    
+    @staticmethod
+    def _parse_funding_bps(data: Dict) -> float:
+        """Absolute funding close in basis points per 8h"""
+        funding_close = float(data['data'][0].get('close', 0))
+        return abs(funding_close) * 10000
+    
+    @staticmethod
+    def _parse_liquidation(data: Dict) -> Tuple[float, float]:
+        """Long and short aggregated liquidation USD"""
+        latest = data['data'][0]
+        return (
+            float(latest.get('aggregated_long_liquidation_usd', 0)),
+            float(latest.get('aggregated_short_liquidation_usd', 0))
+        )
+    
+    @staticmethod
+    def _parse_etf_flow(data: Dict) -> float:
+        """Absolute ETF flow USD"""
+        return abs(float(data['data'][0].get('flow_usd', 0)))
+    
+    def _percentile_bounds(self, layer: str, symbol: str, mirror: bool = False) -> Tuple[Optional[float], ...]:
+        """Rolling (watch, action) percentile thresholds in classify_level argument order
+        
+        With mirror=True the lower bounds 2 - watch / 2 - action are appended so
+        the bidirectional taker band is a flat comparison.
+        """
+        cfg = self._layer_cfgs[layer]
+        p_watch = self.percentile_engine.calculate_percentile(layer, symbol, cfg.p_watch)
+        p_action = self.percentile_engine.calculate_percentile(layer, symbol, cfg.p_action)
+        if not mirror:
+            return p_watch, p_action
+        return (p_watch, p_action,
+                2 - p_watch if p_watch else None, 2 - p_action if p_action else None)
+    
+    def _etf_ma7(self, symbol: str, current: float) -> float:
+        """7-day moving average of ETF flows (current value until enough history)"""
+        ma7 = self.percentile_engine.etf_moving_average(symbol)
+        return current if ma7 is None else ma7  # Use current value if not enough history
+    
+    async def analyze_taker_ratio(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze taker buy/sell ratio with rolling percentile"""
         try:
             # Get taker buy/sell data from CoinGlass v4
             data = self.client.taker_buysell_volume_aggregated(symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("taker_ratio", "none", 0, 0)
-            
-            latest = data['data'][0]
-            buy_volume = float(latest.get('aggregated_buy_volume_usd', 0))
-            sell_volume = float(latest.get('aggregated_sell_volume_usd', 1))  # Avoid division by zero
+                return LayerSignal("taker_ratio", Level.NONE, 0, 0)
             
             # Calculate taker ratio: buy / max(1, sell)
-            taker_ratio = buy_volume / max(1, sell_volume)
+            taker_ratio = self._parse_taker_ratio(data)
             
             # Add to historical data
             self.percentile_engine.add_data_point("taker_ratio", symbol, taker_ratio)
             
             # Get thresholds
-            config = self.config['layers']['taker_ratio']
+            config = self.cfg_taker
             
-            # Try percentile thresholds first
-            p_watch = self.percentile_engine.calculate_percentile("taker_ratio", symbol, config['p_watch'])
-            p_action = self.percentile_engine.calculate_percentile("taker_ratio", symbol, config['p_action'])
+            # Try percentile thresholds first, mirrored around 1.0
+            bounds = self._percentile_bounds("taker_ratio", symbol, mirror=True)
             
             # Determine signal level
-            if p_action and (taker_ratio >= p_action or taker_ratio <= (2 - p_action)):
-                level = "action"
-                threshold = p_action
-                percentile = config['p_action']
-            elif p_watch and (taker_ratio >= p_watch or taker_ratio <= (2 - p_watch)):
-                level = "watch"  
-                threshold = p_watch
-                percentile = config['p_watch']
+            code = classify_level(taker_ratio, *bounds)
+            if code:
+                threshold = bounds[code - 1]
+                percentile = (None, config.p_watch, config.p_action)[code]
             else:
                 # Fallback to absolute thresholds
-                abs_action = config['abs_action']
-                abs_watch = config['abs_watch']
+                abs_action = config.abs_action
+                abs_watch = config.abs_watch
                 
-                if taker_ratio >= abs_action[0] or taker_ratio <= abs_action[1]:
-                    level = "action"
-                    threshold = abs_action[0] if taker_ratio >= abs_action[0] else abs_action[1]
-                    percentile = None
-                elif taker_ratio >= abs_watch[0] or taker_ratio <= abs_watch[1]:
-                    level = "watch"
-                    threshold = abs_watch[0] if taker_ratio >= abs_watch[0] else abs_watch[1]
-                    percentile = None
-                else:
-                    level = "none"
-                    threshold = 0
-                    percentile = None
+                code = classify_level(taker_ratio, *config.abs_bounds)
+                band = (None, abs_watch, abs_action)[code]
+                threshold = 0 if band is None else (band[0] if taker_ratio >= band[0] else band[1])
+                percentile = None
+            level = Level(code)
             
-            logger.debug(f"📊 Taker ratio {symbol}: {taker_ratio:.3f} → {level}")
+            logger.debug(f"📊 Taker ratio {symbol}: {taker_ratio:.3f} → {level.label}")
             
             return LayerSignal(
                 name="taker_ratio",
@@ -198,63 +588,47 @@ class EnhancedSniperEngine:
                 value=taker_ratio,
                 threshold_used=threshold,
                 percentile_used=percentile,
-                timestamp=datetime.now()
+                timestamp=ts or datetime.now()
             )
             
         except Exception as e:
             logger.error(f"❌ Taker ratio analysis failed for {symbol}: {e}")
-            return LayerSignal("taker_ratio", "none", 0, 0)
+            return LayerSignal("taker_ratio", Level.NONE, 0, 0)
     
-    async def analyze_funding_rate(self, symbol: str) -> LayerSignal:
+    async def analyze_funding_rate(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze funding rate with OHLC format"""
         try:
             # Get funding rate OHLC from CoinGlass v4
             data = self.client.funding_rate(symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("funding", "none", 0, 0)
-            
-            latest = data['data'][0]
-            funding_close = float(latest.get('close', 0))
+                return LayerSignal("funding", Level.NONE, 0, 0)
             
             # Convert to basis points per 8h (standardize)
-            funding_bps_8h = abs(funding_close) * 10000  # Convert to bps
+            funding_bps_8h = self._parse_funding_bps(data)
             
             # Add to historical data
             self.percentile_engine.add_data_point("funding", symbol, funding_bps_8h)
             
             # Get thresholds
-            config = self.config['layers']['funding']
+            config = self.cfg_funding
             
             # Try percentile thresholds
-            p_watch = self.percentile_engine.calculate_percentile("funding", symbol, config['p_watch'])
-            p_action = self.percentile_engine.calculate_percentile("funding", symbol, config['p_action'])
+            bounds = self._percentile_bounds("funding", symbol)
             
             # Determine signal level
-            if p_action and funding_bps_8h >= p_action:
-                level = "action"
-                threshold = p_action
-                percentile = config['p_action']
-            elif p_watch and funding_bps_8h >= p_watch:
-                level = "watch"
-                threshold = p_watch
-                percentile = config['p_watch']
+            code = classify_level(funding_bps_8h, *bounds)
+            if code:
+                threshold = bounds[code - 1]
+                percentile = (None, config.p_watch, config.p_action)[code]
             else:
                 # Fallback to absolute thresholds
-                if funding_bps_8h >= config['abs_per_8h_action_bps']:
-                    level = "action"
-                    threshold = config['abs_per_8h_action_bps']
-                    percentile = None
-                elif funding_bps_8h >= config['abs_per_8h_watch_bps']:
-                    level = "watch"
-                    threshold = config['abs_per_8h_watch_bps']
-                    percentile = None
-                else:
-                    level = "none"
-                    threshold = 0
-                    percentile = None
+                code = classify_level(funding_bps_8h, *config.abs_bounds)
+                threshold = config.abs_bounds[code - 1] if code else 0
+                percentile = None
+            level = Level(code)
             
-            logger.debug(f"💰 Funding rate {symbol}: {funding_bps_8h:.1f}bps → {level}")
+            logger.debug(f"💰 Funding rate {symbol}: {funding_bps_8h:.1f}bps → {level.label}")
             
             return LayerSignal(
                 name="funding",
@@ -262,56 +636,45 @@ class EnhancedSniperEngine:
                 value=funding_bps_8h,
                 threshold_used=threshold,
                 percentile_used=percentile,
-                timestamp=datetime.now()
+                timestamp=ts or datetime.now()
             )
             
         except Exception as e:
             logger.error(f"❌ Funding rate analysis failed for {symbol}: {e}")
-            return LayerSignal("funding", "none", 0, 0)
+            return LayerSignal("funding", Level.NONE, 0, 0)
     
-    async def analyze_liquidation(self, symbol: str) -> LayerSignal:
+    async def analyze_liquidation(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze liquidation with coin aggregated history"""
         try:
             # Get liquidation coin aggregated data
             data = self.client.liquidation_coin_history(symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("liquidation", "none", 0, 0)
+                return LayerSignal("liquidation", Level.NONE, 0, 0)
             
-            latest = data['data'][0]
-            long_liq = float(latest.get('aggregated_long_liquidation_usd', 0))
-            short_liq = float(latest.get('aggregated_short_liquidation_usd', 0))
+            long_liq, short_liq = self._parse_liquidation(data)
             total_liq = long_liq + short_liq
             
             # Add to historical data
             self.percentile_engine.add_data_point("liquidation", symbol, total_liq)
             
             # Get thresholds
-            config = self.config['layers']['liquidation']
+            config = self.cfg_liquidation
             
             # Calculate percentiles for 7d lookback
-            p_watch = self.percentile_engine.calculate_percentile("liquidation", symbol, config['p_watch'])
-            p_action = self.percentile_engine.calculate_percentile("liquidation", symbol, config['p_action'])
+            bounds = self._percentile_bounds("liquidation", symbol)
             
             # Determine signal level
-            level = "none"
-            threshold = 0
-            percentile = None
-            
-            if p_action and total_liq >= p_action:
-                level = "action"
-                threshold = p_action
-                percentile = config['p_action']
-            elif p_watch and total_liq >= p_watch:
-                level = "watch"
-                threshold = p_watch  
-                percentile = config['p_watch']
+            code = classify_level(total_liq, *bounds)
+            level = Level(code)
+            threshold = bounds[code - 1] if code else 0
+            percentile = (None, config.p_watch, config.p_action)[code]
             
             # Kill-switch logic: if liquidation spike opposite to bias
-            if level == "action":
-                await self._check_liquidation_kill_switch(symbol, long_liq, short_liq)
+            if level == Level.ACTION:
+                await self._check_liquidation_kill_switch(symbol, long_liq, short_liq, ts)
             
-            logger.debug(f"🔥 Liquidation {symbol}: ${total_liq:,.0f} → {level}")
+            logger.debug(f"🔥 Liquidation {symbol}: ${total_liq:,.0f} → {level.label}")
             
             return LayerSignal(
                 name="liquidation",
@@ -319,64 +682,56 @@ class EnhancedSniperEngine:
                 value=total_liq,
                 threshold_used=threshold,
                 percentile_used=percentile,
-                timestamp=datetime.now()
+                timestamp=ts or datetime.now()
             )
             
         except Exception as e:
             logger.error(f"❌ Liquidation analysis failed for {symbol}: {e}")
-            return LayerSignal("liquidation", "none", 0, 0)
+            return LayerSignal("liquidation", Level.NONE, 0, 0)
     
-    async def analyze_etf_flows(self, symbol: str = "BTC") -> LayerSignal:
+    async def analyze_etf_flows(self, symbol: str = "BTC", ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze ETF flows with flow-history endpoint"""
         try:
             # Get ETF flow-history data
             data = self.client.etf_bitcoin_flows()
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("etf_flows", "none", 0, 0)
-            
-            latest = data['data'][0]
-            flow_usd = float(latest.get('flow_usd', 0))
+                return LayerSignal("etf_flows", Level.NONE, 0, 0)
             
             # Calculate absolute flow value
-            abs_flow = abs(flow_usd)
+            abs_flow = self._parse_etf_flow(data)
             
             # Add to historical data
             self.percentile_engine.add_data_point("etf_flows", symbol, abs_flow)
             
             # Calculate MA7 (moving average 7 days)
-            data_queue = self.percentile_engine.historical_data[f"etf_flows_{symbol}"]['values']
-            if len(data_queue) >= 7:
-                recent_7 = list(data_queue)[-7:]
-                ma7 = np.mean(recent_7)
-            else:
-                ma7 = abs_flow  # Use current value if not enough history
+            ma7 = self._etf_ma7(symbol, abs_flow)
             
             # Get thresholds
-            config = self.config['layers']['etf_flows']
+            config = self.cfg_etf
             
             # Calculate thresholds
-            watch_threshold = ma7 * config['mult_watch']
-            action_threshold = ma7 * config['mult_action']
+            watch_threshold = ma7 * config.mult_watch
+            action_threshold = ma7 * config.mult_action
             
             # Also check p95 90d if available
-            p95_90d = self.percentile_engine.calculate_percentile("etf_flows", symbol, config['p_action_90d'])
+            p95_90d = self.percentile_engine.calculate_percentile("etf_flows", symbol, config.p_action_90d)
             
             # Determine signal level
             if (abs_flow >= action_threshold) or (p95_90d and abs_flow >= p95_90d):
-                level = "action"
+                level = Level.ACTION
                 threshold = action_threshold
-                percentile = config['p_action_90d'] if p95_90d and abs_flow >= p95_90d else None
+                percentile = config.p_action_90d if p95_90d and abs_flow >= p95_90d else None
             elif abs_flow >= watch_threshold:
-                level = "watch"
+                level = Level.WATCH
                 threshold = watch_threshold
                 percentile = None
             else:
-                level = "none"
+                level = Level.NONE
                 threshold = 0
                 percentile = None
             
-            logger.debug(f"🏦 ETF flows {symbol}: ${abs_flow:,.0f} (MA7: ${ma7:,.0f}) → {level}")
+            logger.debug(f"🏦 ETF flows {symbol}: ${abs_flow:,.0f} (MA7: ${ma7:,.0f}) → {level.label}")
             
             return LayerSignal(
                 name="etf_flows",
@@ -384,14 +739,144 @@ class EnhancedSniperEngine:
                 value=abs_flow,
                 threshold_used=threshold,
                 percentile_used=percentile,
-                timestamp=datetime.now()
+                timestamp=ts or datetime.now()
             )
             
         except Exception as e:
             logger.error(f"❌ ETF flows analysis failed: {e}")
-            return LayerSignal("etf_flows", "none", 0, 0)
+            return LayerSignal("etf_flows", Level.NONE, 0, 0)
+    
+    async def _fetch_layers_batch(self, symbols: List[str]) -> List[Optional[Dict]]:
+        """Fetch 3 per-symbol layers plus the shared ETF flow concurrently
+        
+        Responses come back flat as [taker, funding, liquidation] * N + [etf];
+        failed calls are None.
+        """
+        semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+        
+        async def fetch(method, *args):
+            async with semaphore:
+                return await asyncio.to_thread(method, *args)  # client is synchronous
+        
+        fetches = []
+        for symbol in symbols:
+            fetches.append(fetch(self.client.taker_buysell_volume_aggregated, symbol, "1h"))
+            fetches.append(fetch(self.client.funding_rate, symbol, "1h"))
+            fetches.append(fetch(self.client.liquidation_coin_history, symbol, "1h"))
+        fetches.append(fetch(self.client.etf_bitcoin_flows))  # ETF is always BTC
+        responses = await asyncio.gather(*fetches, return_exceptions=True)
+        return [None if isinstance(r, Exception) else r for r in responses]
+    
+    async def analyze_all_layers_batch(self, symbols: List[str]) -> np.ndarray:
+        """Analyze all layers for many symbols at once
+        
+        Returns an (N, 4) array of level codes (0=none, 1=watch, 2=action) with
+        columns in BATCH_LAYERS order.
+        """
+        levels, _, _ = await self._analyze_layers_arrays(symbols)
+        return levels
     
-    async def _check_liquidation_kill_switch(self, symbol: str, long_liq: float, short_liq: float):
+    async def _analyze_layers_arrays(self, symbols: List[str],
+                                     ts: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(levels, values, thresholds) arrays of shape (N, 4) for the batch paths"""
+        n = len(symbols)
+        if n == 0:
+            empty = np.zeros((0, len(BATCH_LAYERS)))
+            return empty.astype(np.uint8), empty, empty
+        
+        responses = await self._fetch_layers_batch(symbols)
+        etf_data = responses[-1]
+        
+        # Raw values; NaN marks a missing response
+        values = np.full((n, len(BATCH_LAYERS)), np.nan)
+        liquidation_sides = np.zeros((n, 2))
+        parsers = (self._parse_taker_ratio, self._parse_funding_bps)
+        for i in range(n):
+            taker_data, funding_data, liq_data = responses[3 * i:3 * i + 3]
+            for col, (data, parse) in enumerate(zip((taker_data, funding_data), parsers)):
+                if self._has_rows(data):
+                    values[i, col] = parse(data)
+            if self._has_rows(liq_data):
+                liquidation_sides[i] = self._parse_liquidation(liq_data)
+                values[i, 2] = liquidation_sides[i].sum()
+        
+        etf_flow = self._parse_etf_flow(etf_data) if self._has_rows(etf_data) else np.nan
+        if not np.isnan(etf_flow):
+            self.percentile_engine.add_data_point("etf_flows", "BTC", etf_flow)
+        values[:, 3] = etf_flow
+        
+        # Update windows, then gather per-symbol percentile thresholds
+        p_watch = np.full((n, 3), np.nan)
+        p_action = np.full((n, 3), np.nan)
+        for i, symbol in enumerate(symbols):
+            for col, layer in enumerate(BATCH_LAYERS[:3]):
+                if np.isnan(values[i, col]):
+                    continue
+                self.percentile_engine.add_data_point(layer, symbol, values[i, col])
+                watch, action = self._percentile_bounds(layer, symbol)
+                p_watch[i, col] = np.nan if watch is None else watch
+                p_action[i, col] = np.nan if action is None else action
+        
+        with np.errstate(invalid='ignore'):
+            levels = np.zeros((n, len(BATCH_LAYERS)), dtype=np.uint8)
+            thresholds = np.zeros((n, len(BATCH_LAYERS)))
+            
+            # Taker ratio: bidirectional percentile bands, absolute fallback
+            taker = values[:, 0]
+            cfg = self.cfg_taker
+            pct_action = (taker >= p_action[:, 0]) | (taker <= 2 - p_action[:, 0])
+            pct_watch = (taker >= p_watch[:, 0]) | (taker <= 2 - p_watch[:, 0])
+            abs_action = (taker >= cfg.abs_action[0]) | (taker <= cfg.abs_action[1])
+            abs_watch = (taker >= cfg.abs_watch[0]) | (taker <= cfg.abs_watch[1])
+            levels[:, 0] = np.where(pct_action, 2, np.where(pct_watch, 1,
+                           np.where(abs_action, 2, np.where(abs_watch, 1, 0))))
+            thresholds[:, 0] = np.select(
+                [pct_action, pct_watch, abs_action, abs_watch],
+                [p_action[:, 0], p_watch[:, 0],
+                 np.where(taker >= cfg.abs_action[0], cfg.abs_action[0], cfg.abs_action[1]),
+                 np.where(taker >= cfg.abs_watch[0], cfg.abs_watch[0], cfg.abs_watch[1])]
+            )
+            
+            # Funding: percentile bands, absolute bps fallback
+            funding = values[:, 1]
+            cfg = self.cfg_funding
+            levels[:, 1] = np.where(funding >= p_action[:, 1], 2, np.where(funding >= p_watch[:, 1], 1,
+                           np.where(funding >= cfg.abs_action[0], 2,
+                           np.where(funding >= cfg.abs_watch[0], 1, 0))))
+            thresholds[:, 1] = np.select(
+                [funding >= p_action[:, 1], funding >= p_watch[:, 1],
+                 funding >= cfg.abs_action[0], funding >= cfg.abs_watch[0]],
+                [p_action[:, 1], p_watch[:, 1], cfg.abs_action[0], cfg.abs_watch[0]]
+            )
+            
+            # Liquidation: percentile bands only
+            liquidation = values[:, 2]
+            levels[:, 2] = np.where(liquidation >= p_action[:, 2], 2, np.where(liquidation >= p_watch[:, 2], 1, 0))
+            thresholds[:, 2] = np.select(
+                [liquidation >= p_action[:, 2], liquidation >= p_watch[:, 2]],
+                [p_action[:, 2], p_watch[:, 2]]
+            )
+            
+            # ETF flows: MA7 multiples or 90d percentile (shared across symbols)
+            if not np.isnan(etf_flow):
+                cfg = self.cfg_etf
+                ma7 = self._etf_ma7("BTC", etf_flow)
+                p95_90d = self.percentile_engine.calculate_percentile("etf_flows", "BTC", cfg.p_action_90d)
+                if etf_flow >= ma7 * cfg.mult_action or (p95_90d and etf_flow >= p95_90d):
+                    levels[:, 3] = 2
+                    thresholds[:, 3] = ma7 * cfg.mult_action
+                elif etf_flow >= ma7 * cfg.mult_watch:
+                    levels[:, 3] = 1
+                    thresholds[:, 3] = ma7 * cfg.mult_watch
+        
+        # Kill-switch only matters for symbols with an action-level liquidation
+        for i in np.nonzero(levels[:, 2] == 2)[0]:
+            await self._check_liquidation_kill_switch(symbols[i], *liquidation_sides[i], ts)
+        
+        return levels, values, thresholds
+    
+    async def _check_liquidation_kill_switch(self, symbol: str, long_liq: float, short_liq: float,
+                                             ts: Optional[datetime] = None):
         """Check for liquidation kill-switch condition"""
         try:
             # Get current institutional bias
@@ -400,39 +885,59 @@ class EnhancedSniperEngine:
             
             if long_liq > short_liq * 2:  # Heavy long liquidations
                 self.kill_switch_active = True
-                self.kill_switch_until = datetime.now() + timedelta(minutes=30)
+                self.kill_switch_until = (ts or datetime.now()) + timedelta(minutes=30)
                 logger.warning(f"🚨 Kill-switch activated: Heavy long liquidations detected for {symbol}")
             elif short_liq > long_liq * 2:  # Heavy short liquidations  
                 self.kill_switch_active = True
-                self.kill_switch_until = datetime.now() + timedelta(minutes=30)
+                self.kill_switch_until = (ts or datetime.now()) + timedelta(minutes=30)
                 logger.warning(f"🚨 Kill-switch activated: Heavy short liquidations detected for {symbol}")
             
         except Exception as e:
             logger.error(f"❌ Kill-switch check failed: {e}")
     
+    def _empty_result(self, ts: datetime) -> ConfluenceResult:
+        """No-signal result (kill-switch suppression or failed analysis)"""
+        return ConfluenceResult(
+            overall_level=Level.NONE,
+            layers_triggered=[],
+            confluence_score=0,
+            kill_switch_active=self.kill_switch_active,
+            timestamp=ts
+        )
+    
     async def run_confluence_analysis(self, symbol: str) -> ConfluenceResult:
         """Run full confluence analysis for symbol"""
+        now = datetime.now()  # one timestamp for the whole tick
         try:
             # Check kill-switch status
             if (self.kill_switch_until and 
-                datetime.now() < self.kill_switch_until):
+                now < self.kill_switch_until):
                 self.kill_switch_active = True
             else:
                 self.kill_switch_active = False
             
+            # Signals would be overridden to none anyway; skip the layer fetches
+            if self.kill_switch_active:
+                logger.warning(f"🚨 Kill-switch active: {symbol} analysis skipped")
+                return self._empty_result(now)
+            
             # Run all layer analyses in parallel
             layer_tasks = [
-                self.analyze_taker_ratio(symbol),
-                self.analyze_funding_rate(symbol),
-                self.analyze_liquidation(symbol),
-                self.analyze_etf_flows("BTC")  # ETF is always BTC
+                self.analyze_taker_ratio(symbol, now),
+                self.analyze_funding_rate(symbol, now),
+                self.analyze_liquidation(symbol, now),
+                self.analyze_etf_flows("BTC", now)  # ETF is always BTC
             ]
             
             layer_results = await asyncio.gather(*layer_tasks)
             
-            # Count signals by level
-            watch_count = sum(1 for signal in layer_results if signal.level == "watch")
-            action_count = sum(1 for signal in layer_results if signal.level == "action")
+            # Count signals by level in one pass
+            watch_count = action_count = 0
+            for signal in layer_results:
+                if signal.level == Level.ACTION:
+                    action_count += 1
+                elif signal.level == Level.WATCH:
+                    watch_count += 1
             
             # Apply confluence rules
             config = self.config['confluence']
@@ -440,15 +945,15 @@ class EnhancedSniperEngine:
             
             # Determine overall level
             if (action_count >= 1 and total_signals >= config['action_min']):
-                overall_level = "action"
+                overall_level = Level.ACTION
             elif total_signals >= config['watch_min']:
-                overall_level = "watch"
+                overall_level = Level.WATCH
             else:
-                overall_level = "none"
+                overall_level = Level.NONE
             
             # Override with kill-switch
-            if self.kill_switch_active and overall_level in ["watch", "action"]:
-                overall_level = "none"
+            if self.kill_switch_active and overall_level != Level.NONE:
+                overall_level = Level.NONE
                 logger.warning(f"🚨 Kill-switch override: {symbol} signals suppressed")
             
             # Calculate confluence score (0-100)
@@ -456,32 +961,94 @@ class EnhancedSniperEngine:
             actual_score = (watch_count * 1) + (action_count * 2)
             confluence_score = (actual_score / max_possible) * 100
             
-            logger.info(f"🎯 Confluence {symbol}: {overall_level.upper()} (score: {confluence_score:.1f}%) - Watch: {watch_count}, Action: {action_count}")
+            logger.info(f"🎯 Confluence {symbol}: {overall_level.name} (score: {confluence_score:.1f}%) - Watch: {watch_count}, Action: {action_count}")
             
             return ConfluenceResult(
                 overall_level=overall_level,
-                layers_triggered=[s for s in layer_results if s.level != "none"],
+                layers_triggered=[s for s in layer_results if s.level != Level.NONE],
                 confluence_score=confluence_score,
                 kill_switch_active=self.kill_switch_active,
-                timestamp=datetime.now()
+                timestamp=now
             )
             
         except Exception as e:
             logger.error(f"❌ Confluence analysis failed for {symbol}: {e}")
-            return ConfluenceResult(
-                overall_level="none",
-                layers_triggered=[],
-                confluence_score=0,
-                kill_switch_active=self.kill_switch_active,
-                timestamp=datetime.now()
-            )
+            return self._empty_result(now)
+
+    async def run_confluence_batch(self, symbols: List[str]) -> Dict[str, ConfluenceResult]:
+        """Run confluence analysis for a whole symbol universe in one fetch round
+        
+        All 3·N + 1 layer requests go out in a single bounded gather and the
+        thresholds are evaluated on (N, 4) arrays. Triggered layers carry
+        value and threshold but no percentile_used.
+        """
+        now = datetime.now()
+        try:
+            if (self.kill_switch_until and 
+                now < self.kill_switch_until):
+                self.kill_switch_active = True
+            else:
+                self.kill_switch_active = False
+            
+            if self.kill_switch_active:
+                logger.warning(f"🚨 Kill-switch active: batch of {len(symbols)} symbols skipped")
+                return {symbol: self._empty_result(now) for symbol in symbols}
+            
+            levels, values, thresholds = await self._analyze_layers_arrays(symbols, now)
+            
+            config = self.config['confluence']
+            watch_counts = (levels == 1).sum(axis=1)
+            action_counts = (levels == 2).sum(axis=1)
+            totals = watch_counts + action_counts
+            scores = (watch_counts + action_counts * 2) / (len(BATCH_LAYERS) * 2) * 100
+            
+            results = {}
+            for i, symbol in enumerate(symbols):
+                if action_counts[i] >= 1 and totals[i] >= config['action_min']:
+                    overall_level = Level.ACTION
+                elif totals[i] >= config['watch_min']:
+                    overall_level = Level.WATCH
+                else:
+                    overall_level = Level.NONE
+                
+                if self.kill_switch_active and overall_level != Level.NONE:
+                    overall_level = Level.NONE
+                    logger.warning(f"🚨 Kill-switch override: {symbol} signals suppressed")
+                
+                results[symbol] = ConfluenceResult(
+                    overall_level=overall_level,
+                    layers_triggered=[
+                        LayerSignal(
+                            name=layer,
+                            level=Level(levels[i, col]),
+                            value=float(values[i, col]),
+                            threshold_used=float(thresholds[i, col]),
+                            timestamp=now
+                        )
+                        for col, layer in enumerate(BATCH_LAYERS) if levels[i, col]
+                    ],
+                    confluence_score=float(scores[i]),
+                    kill_switch_active=self.kill_switch_active,
+                    timestamp=now
+                )
+            
+            logger.info(f"🎯 Confluence batch: {len(symbols)} symbols - Watch: {int((levels == 1).any(axis=1).sum())}, Action: {int((levels == 2).any(axis=1).sum())}")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"❌ Confluence batch analysis failed: {e}")
+            return {symbol: self._empty_result(now) for symbol in symbols}
 
-# Global engine instance
+# Global engine instance; the lock only guards the first build
 sniper_engine = None
+_engine_lock = threading.Lock()
 
 def get_enhanced_sniper_engine() -> EnhancedSniperEngine:
     """Get singleton Enhanced Sniper Engine instance"""
     global sniper_engine
     if sniper_engine is None:
-        sniper_engine = EnhancedSniperEngine()
+        with _engine_lock:
+            if sniper_engine is None:
+                sniper_engine = EnhancedSniperEngine()
     return sniper_engine
\ No newline at end of file
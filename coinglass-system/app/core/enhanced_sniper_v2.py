@@ -3,22 +3,31 @@ Enhanced Sniper Engine v2 - Pandas Rolling Quantile Integration
 Production-ready with comprehensive unit tests and stable calculations
 """
 import json
+import threading
+import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Sequence
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from collections import defaultdict, deque
+from bisect import bisect_left, insort
+from collections import deque
+import numpy as np
+import pandas as pd
 
 from app.core.logging import logger
 from app.core.coinglass_client import CoinglassClient
+from app.core.mcache import get_cached, set_cached, singleflight
 from app.core.sniper_thresholds import (
-    LayerConfig, ConfluenceConfig,
+    LayerConfig, ConfluenceConfig, normalize_funding_to_bps_per_8h,
     evaluate_bias, evaluate_funding, evaluate_oi_roc, 
     evaluate_taker_ratio, evaluate_liquidation_coin_agg, 
     evaluate_etf_flows, confluence_level
 )
 
+# ETF flows are daily and symbol-independent, one fetch serves a whole scan
+ETF_CACHE_TTL_MS = 300_000
+
 @dataclass
 class LayerSignal:
     """Individual layer signal result"""
@@ -39,27 +48,155 @@ class ConfluenceResult:
     metadata: Dict = None
     timestamp: Optional[datetime] = None
 
+def _extract_columns(rows: List[Dict], defaults: Dict[str, float]) -> List[np.ndarray]:
+    """Numeric columns of API rows in one pandas pass (missing/invalid -> default)"""
+    df = pd.DataFrame(rows)
+    columns = []
+    for column, default in defaults.items():
+        if column in df:
+            columns.append(pd.to_numeric(df[column], errors='coerce').fillna(default).to_numpy(dtype=np.float64))
+        else:
+            columns.append(np.full(len(df), default, dtype=np.float64))
+    return columns
+
+class SortedWindow:
+    """Trailing window kept sorted so each new value costs one insert + one delete"""
+    
+    __slots__ = ("window", "values", "sorted_values", "nans")
+    
+    def __init__(self, window: int, values: Sequence[float] = ()):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.sorted_values: List[float] = []
+        self.nans = 0
+        self.extend(values)
+    
+    def add(self, value: float):
+        value = float(value)
+        if len(self.values) == self.window:
+            evicted = self.values[0]
+            if evicted != evicted:
+                self.nans -= 1
+            else:
+                del self.sorted_values[bisect_left(self.sorted_values, evicted)]
+        self.values.append(value)
+        if value != value:
+            self.nans += 1
+        else:
+            insort(self.sorted_values, value)
+    
+    def extend(self, values: Sequence[float]):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) < self.window:
+            for value in values.tolist():
+                self.add(value)
+            return
+        # The whole window is replaced, rebuild instead of sliding through it
+        tail = values[-self.window:]
+        nan_mask = np.isnan(tail)
+        self.values = deque(tail.tolist(), maxlen=self.window)
+        self.sorted_values = np.sort(tail[~nan_mask]).tolist()
+        self.nans = int(nan_mask.sum())
+    
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Linear-interpolated quantiles (np.quantile semantics), NaN if any value is NaN"""
+        n = len(self.sorted_values)
+        if n == 0 or self.nans:
+            return [float("nan")] * len(qs)
+        result = []
+        for q in qs:
+            pos = q * (n - 1)
+            lo = int(pos)
+            hi = min(lo + 1, n - 1)
+            lo_val = self.sorted_values[lo]
+            result.append(lo_val + (self.sorted_values[hi] - lo_val) * (pos - lo))
+        return result
+
 class DataBuffer:
-    """Thread-safe data buffer for historical data storage"""
+    """Preallocated float64 ring buffers for historical data storage"""
     
     def __init__(self, max_size: int = 2000):
         self.max_size = max_size
-        self.buffers: Dict[str, deque] = defaultdict(lambda: deque(maxlen=max_size))
+        self.arr: Dict[str, np.ndarray] = {}
+        self.count: Dict[str, int] = {}
+        self.head: Dict[str, int] = {}  # next write position
+        self.quantile_state: Dict[str, SortedWindow] = {}
+    
+    def _buffer(self, key: str) -> np.ndarray:
+        arr = self.arr.get(key)
+        if arr is None:
+            arr = self.arr[key] = np.empty(self.max_size, dtype=np.float64)
+            self.count[key] = 0
+            self.head[key] = 0
+        return arr
     
     def add_data(self, key: str, value: float):
         """Add data point to buffer"""
-        self.buffers[key].append(value)
+        arr = self._buffer(key)
+        state = self.quantile_state.get(key)
+        if state is not None:
+            state.add(value)
+        head = self.head[key]
+        arr[head] = value
+        self.head[key] = (head + 1) % self.max_size
+        self.count[key] = min(self.count[key] + 1, self.max_size)
+    
+    def extend(self, key: str, values) -> None:
+        """Append many data points at once (oldest first)"""
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return
+        arr = self._buffer(key)
+        state = self.quantile_state.get(key)
+        if state is not None:
+            state.extend(values)
+        if n >= self.max_size:
+            arr[:] = values[-self.max_size:]
+            self.head[key] = 0
+            self.count[key] = self.max_size
+            return
+        
+        head = self.head[key]
+        first = min(n, self.max_size - head)
+        arr[head:head + first] = values[:first]
+        arr[:n - first] = values[first:]
+        self.head[key] = (head + n) % self.max_size
+        self.count[key] = min(self.count[key] + n, self.max_size)
+    
+    def get_array(self, key: str, lookback: Optional[int] = None) -> np.ndarray:
+        """Buffered values oldest-first, optionally only the last lookback points
+        
+        Returns a view into the buffer unless the requested span wraps around,
+        so it is only valid until the next write to key.
+        """
+        arr = self.arr.get(key)
+        if arr is None:
+            return np.empty(0, dtype=np.float64)
+        count, head = self.count[key], self.head[key]
+        n = min(lookback, count) if lookback else count
+        if n <= head:
+            return arr[head - n:head]
+        return np.concatenate((arr[self.max_size - (n - head):], arr[:head]))
     
     def get_data(self, key: str, lookback: Optional[int] = None) -> List[float]:
         """Get data from buffer with optional lookback limit"""
-        data = list(self.buffers[key])
-        if lookback:
-            return data[-lookback:] if len(data) >= lookback else data
-        return data
+        return self.get_array(key, lookback).tolist()
     
     def has_sufficient_data(self, key: str, min_points: int) -> bool:
         """Check if buffer has sufficient data points"""
-        return len(self.buffers[key]) >= min_points
+        return self.count.get(key, 0) >= min_points
+    
+    def track_quantiles(self, key: str, window: int) -> SortedWindow:
+        """Keep a sorted trailing window for key, bootstrapped from the buffered values"""
+        state = self.quantile_state.get(key)
+        if state is None or state.window != window:
+            state = self.quantile_state[key] = SortedWindow(window, self.get_array(key, window))
+        return state
+    
+    def window_quantiles(self, key: str, qs: Sequence[float]) -> List[float]:
+        """Quantiles of the tracked trailing window for key"""
+        return self.quantile_state[key].quantiles(qs)
 
 class EnhancedSniperEngineV2:
     """
@@ -94,8 +231,9 @@ class EnhancedSniperEngineV2:
         
         logger.info("🎯 Enhanced Sniper Engine V2 initialized with pandas rolling quantile")
     
-    async def analyze_institutional_bias(self, symbol: str) -> LayerSignal:
+    async def analyze_institutional_bias(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze institutional bias using z-score and absolute thresholds"""
+        ts = ts or datetime.now()
         try:
             # This would integrate with your existing bias calculation system
             # For demo, we'll use a placeholder score
@@ -103,7 +241,7 @@ class EnhancedSniperEngineV2:
             
             # Get historical bias scores
             bias_key = f"bias_{symbol}"
-            hist_scores = self.data_buffer.get_data(bias_key, lookback=100)
+            hist_scores = self.data_buffer.get_array(bias_key, lookback=100)
             
             if len(hist_scores) < 10:
                 # Not enough historical data, use absolute threshold only
@@ -116,7 +254,7 @@ class EnhancedSniperEngineV2:
                     value=current_score,
                     threshold_used=self.layer_config.bias_abs_action if level == "action" else self.layer_config.bias_abs_watch,
                     metadata={"method": "absolute", "hist_points": len(hist_scores)},
-                    timestamp=datetime.now()
+                    timestamp=ts
                 )
             
             # Evaluate using pandas-based evaluator
@@ -132,44 +270,44 @@ class EnhancedSniperEngineV2:
                 value=current_score,
                 threshold_used=threshold,
                 metadata={"method": "z_score", "hist_points": len(hist_scores)},
-                timestamp=datetime.now()
+                timestamp=ts
             )
             
         except Exception as e:
             logger.error(f"❌ Institutional bias analysis failed for {symbol}: {e}")
-            return LayerSignal("bias", "none", 0, 0, timestamp=datetime.now())
+            return LayerSignal("bias", "none", 0, 0, timestamp=ts)
     
-    async def analyze_funding_rate(self, symbol: str) -> LayerSignal:
+    async def analyze_funding_rate(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze funding rate with pandas rolling percentile"""
+        ts = ts or datetime.now()
         try:
-            # Get funding rate OHLC from CoinGlass v4
-            data = self.client.funding_rate(symbol, "1h")
+            # Get funding rate OHLC from CoinGlass v4 (client is synchronous, keep it off the loop)
+            data = await asyncio.to_thread(self.client.funding_rate, symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("funding", "none", 0, 0, timestamp=datetime.now())
+                return LayerSignal("funding", "none", 0, 0, timestamp=ts)
             
-            # Extract funding rate values
-            funding_values = []
-            for item in data['data'][:100]:  # Last 100 data points
-                funding_close = float(item.get('close', 0))
-                funding_values.append(funding_close)
+            # Extract funding rate values (last 100 data points)
+            funding_values, = _extract_columns(data['data'][:100], {'close': 0.0})
             
-            if not funding_values:
-                return LayerSignal("funding", "none", 0, 0, timestamp=datetime.now())
+            if funding_values.size == 0:
+                return LayerSignal("funding", "none", 0, 0, timestamp=ts)
             
-            # Store in buffer
+            # Store in buffer, which then holds all historical data including new values
             funding_key = f"funding_{symbol}"
-            for val in funding_values[:-1]:  # All except latest
-                self.data_buffer.add_data(funding_key, val)
+            self.data_buffer.extend(funding_key, funding_values)
+            all_funding = self.data_buffer.get_array(funding_key)
             
-            # Get all historical data including new values
-            all_funding = self.data_buffer.get_data(funding_key) + funding_values
+            # Percentile state slides incrementally over the normalized series
+            bps_key = f"funding_bps8_{symbol}"
+            self.data_buffer.track_quantiles(bps_key, self.layer_config.fund_lookback)
+            self.data_buffer.extend(bps_key, normalize_funding_to_bps_per_8h(funding_values, 1.0))
+            quantiles = self.data_buffer.window_quantiles(
+                bps_key, (self.layer_config.fund_p_watch, self.layer_config.fund_p_action))
             
             # Evaluate using pandas-based evaluator
-            level, metadata = evaluate_funding(all_funding, interval_hours=1.0, cfg=self.layer_config)
-            
-            # Add latest value to buffer
-            self.data_buffer.add_data(funding_key, funding_values[-1])
+            level, metadata = evaluate_funding(all_funding, interval_hours=1.0, cfg=self.layer_config,
+                                               quantiles=quantiles)
             
             return LayerSignal(
                 name="funding",
@@ -177,51 +315,50 @@ class EnhancedSniperEngineV2:
                 value=metadata.get("now_bps8", 0),
                 threshold_used=metadata.get("p95" if level == "action" else "p85", 0),
                 metadata=metadata,
-                timestamp=datetime.now()
+                timestamp=ts
             )
             
         except Exception as e:
             logger.error(f"❌ Funding rate analysis failed for {symbol}: {e}")
-            return LayerSignal("funding", "none", 0, 0, timestamp=datetime.now())
+            return LayerSignal("funding", "none", 0, 0, timestamp=ts)
     
-    async def analyze_taker_ratio(self, symbol: str) -> LayerSignal:
+    async def analyze_taker_ratio(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze taker buy/sell ratio with pandas rolling percentile"""
+        ts = ts or datetime.now()
         try:
             # Get taker buy/sell data from CoinGlass v4
-            data = self.client.taker_buysell_volume_aggregated(symbol, "1h")
+            data = await asyncio.to_thread(self.client.taker_buysell_volume_aggregated, symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("taker_ratio", "none", 0, 0, timestamp=datetime.now())
+                return LayerSignal("taker_ratio", "none", 0, 0, timestamp=ts)
             
-            # Extract buy/sell volumes
-            buy_volumes, sell_volumes = [], []
-            for item in data['data'][:100]:  # Last 100 data points
-                buy_vol = float(item.get('aggregated_buy_volume_usd', 0))
-                sell_vol = float(item.get('aggregated_sell_volume_usd', 1))
-                buy_volumes.append(buy_vol)
-                sell_volumes.append(sell_vol)
+            # Extract buy/sell volumes (last 100 data points)
+            buy_volumes, sell_volumes = _extract_columns(data['data'][:100], {
+                'aggregated_buy_volume_usd': 0.0,
+                'aggregated_sell_volume_usd': 1.0
+            })
             
-            if not buy_volumes or not sell_volumes:
-                return LayerSignal("taker_ratio", "none", 0, 0, timestamp=datetime.now())
+            if buy_volumes.size == 0:
+                return LayerSignal("taker_ratio", "none", 0, 0, timestamp=ts)
             
-            # Store in buffer (all except latest)
+            # Store in buffer, which then holds all historical data
             buy_key = f"taker_buy_{symbol}"
             sell_key = f"taker_sell_{symbol}"
             
-            for buy_val, sell_val in zip(buy_volumes[:-1], sell_volumes[:-1]):
-                self.data_buffer.add_data(buy_key, buy_val)
-                self.data_buffer.add_data(sell_key, sell_val)
+            self.data_buffer.extend(buy_key, buy_volumes)
+            self.data_buffer.extend(sell_key, sell_volumes)
+            all_buys = self.data_buffer.get_array(buy_key)
+            all_sells = self.data_buffer.get_array(sell_key)
             
-            # Get all historical data
-            all_buys = self.data_buffer.get_data(buy_key) + buy_volumes
-            all_sells = self.data_buffer.get_data(sell_key) + sell_volumes
+            # Percentile state slides incrementally over the ratio series
+            ratio_key = f"taker_ratio_{symbol}"
+            self.data_buffer.track_quantiles(ratio_key, self.layer_config.taker_lookback)
+            self.data_buffer.extend(ratio_key, buy_volumes / np.maximum(sell_volumes, 1e-12))
+            quantiles = self.data_buffer.window_quantiles(
+                ratio_key, (self.layer_config.taker_p_watch, self.layer_config.taker_p_action))
             
             # Evaluate using pandas-based evaluator
-            level, metadata = evaluate_taker_ratio(all_buys, all_sells, self.layer_config)
-            
-            # Add latest values to buffer
-            self.data_buffer.add_data(buy_key, buy_volumes[-1])
-            self.data_buffer.add_data(sell_key, sell_volumes[-1])
+            level, metadata = evaluate_taker_ratio(all_buys, all_sells, self.layer_config, quantiles=quantiles)
             
             return LayerSignal(
                 name="taker_ratio",
@@ -229,54 +366,54 @@ class EnhancedSniperEngineV2:
                 value=metadata.get("now", 0),
                 threshold_used=metadata.get("p95" if level == "action" else "p85", 0),
                 metadata=metadata,
-                timestamp=datetime.now()
+                timestamp=ts
             )
             
         except Exception as e:
             logger.error(f"❌ Taker ratio analysis failed for {symbol}: {e}")
-            return LayerSignal("taker_ratio", "none", 0, 0, timestamp=datetime.now())
+            return LayerSignal("taker_ratio", "none", 0, 0, timestamp=ts)
     
-    async def analyze_liquidation(self, symbol: str) -> LayerSignal:
+    async def analyze_liquidation(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze liquidation with pandas rolling percentile"""
+        ts = ts or datetime.now()
         try:
             # Get liquidation coin aggregated data
-            data = self.client.liquidation_coin_history(symbol, "1h")
+            data = await asyncio.to_thread(self.client.liquidation_coin_history, symbol, "1h")
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("liquidation", "none", 0, 0, timestamp=datetime.now())
+                return LayerSignal("liquidation", "none", 0, 0, timestamp=ts)
             
-            # Extract liquidation data
-            long_liqs, short_liqs = [], []
-            for item in data['data'][:168]:  # Last 7 days (168 hours)
-                long_liq = float(item.get('aggregated_long_liquidation_usd', 0))
-                short_liq = float(item.get('aggregated_short_liquidation_usd', 0))
-                long_liqs.append(long_liq)
-                short_liqs.append(short_liq)
+            # Extract liquidation data (last 7 days / 168 hours)
+            long_liqs, short_liqs = _extract_columns(data['data'][:168], {
+                'aggregated_long_liquidation_usd': 0.0,
+                'aggregated_short_liquidation_usd': 0.0
+            })
             
-            if not long_liqs or not short_liqs:
-                return LayerSignal("liquidation", "none", 0, 0, timestamp=datetime.now())
+            if long_liqs.size == 0:
+                return LayerSignal("liquidation", "none", 0, 0, timestamp=ts)
             
-            # Store in buffer
+            # Store in buffer, which then holds all historical data
             long_key = f"liq_long_{symbol}"
             short_key = f"liq_short_{symbol}"
             
-            for long_val, short_val in zip(long_liqs[:-1], short_liqs[:-1]):
-                self.data_buffer.add_data(long_key, long_val)
-                self.data_buffer.add_data(short_key, short_val)
+            self.data_buffer.extend(long_key, long_liqs)
+            self.data_buffer.extend(short_key, short_liqs)
+            all_longs = self.data_buffer.get_array(long_key)
+            all_shorts = self.data_buffer.get_array(short_key)
             
-            # Get all historical data
-            all_longs = self.data_buffer.get_data(long_key) + long_liqs
-            all_shorts = self.data_buffer.get_data(short_key) + short_liqs
+            # Percentile state slides incrementally over the total series
+            total_key = f"liq_total_{symbol}"
+            self.data_buffer.track_quantiles(total_key, self.layer_config.liq_lookback)
+            self.data_buffer.extend(total_key, long_liqs + short_liqs)
+            quantiles = self.data_buffer.window_quantiles(
+                total_key, (self.layer_config.liq_p_watch, self.layer_config.liq_p_action))
             
             # Evaluate using pandas-based evaluator
-            level, metadata = evaluate_liquidation_coin_agg(all_longs, all_shorts, self.layer_config)
-            
-            # Add latest values
-            self.data_buffer.add_data(long_key, long_liqs[-1])
-            self.data_buffer.add_data(short_key, short_liqs[-1])
+            level, metadata = evaluate_liquidation_coin_agg(all_longs, all_shorts, self.layer_config,
+                                                            quantiles=quantiles)
             
             # Check for kill-switch condition
-            await self._check_liquidation_kill_switch(symbol, long_liqs[-1], short_liqs[-1])
+            await self._check_liquidation_kill_switch(symbol, long_liqs[-1], short_liqs[-1], ts)
             
             return LayerSignal(
                 name="liquidation",
@@ -284,90 +421,104 @@ class EnhancedSniperEngineV2:
                 value=metadata.get("now", 0),
                 threshold_used=metadata.get("p99" if level == "action" else "p95", 0),
                 metadata=metadata,
-                timestamp=datetime.now()
+                timestamp=ts
             )
             
         except Exception as e:
             logger.error(f"❌ Liquidation analysis failed for {symbol}: {e}")
-            return LayerSignal("liquidation", "none", 0, 0, timestamp=datetime.now())
+            return LayerSignal("liquidation", "none", 0, 0, timestamp=ts)
     
-    async def analyze_etf_flows(self, symbol: str = "BTC") -> LayerSignal:
+    async def analyze_etf_flows(self, symbol: str = "BTC", ts: Optional[datetime] = None) -> LayerSignal:
+        """Analyze ETF flows, shared across every symbol scanned within the cache TTL"""
+        cache_key = f"sniper_v2:etf_flows:{symbol}"
+        cached = get_cached(cache_key, ttl_ms=ETF_CACHE_TTL_MS)
+        if cached is not None:
+            return cached
+        
+        # Concurrent first callers wait for one fetch instead of each polling
+        lock = await singleflight(cache_key)
+        try:
+            cached = get_cached(cache_key, ttl_ms=ETF_CACHE_TTL_MS)
+            if cached is not None:
+                return cached
+            
+            signal = await self._analyze_etf_flows(symbol, ts)
+            if signal.metadata is not None:  # don't pin a failed fetch for the whole TTL
+                set_cached(cache_key, signal)
+            return signal
+        finally:
+            lock.release()
+    
+    async def _analyze_etf_flows(self, symbol: str, ts: Optional[datetime] = None) -> LayerSignal:
         """Analyze ETF flows with pandas rolling percentile"""
+        ts = ts or datetime.now()
         try:
             # Get ETF flow-history data
-            data = self.client.etf_bitcoin_flows()
+            data = await asyncio.to_thread(self.client.etf_bitcoin_flows)
             
             if not data or 'data' not in data or not data['data']:
-                return LayerSignal("etf_flows", "none", 0, 0, timestamp=datetime.now())
+                return LayerSignal("etf_flows", "none", 0, 0, timestamp=ts)
             
-            # Extract flow data
-            flow_values = []
-            for item in data['data'][:2160]:  # Last 90 days
-                flow_usd = float(item.get('flow_usd', 0))
-                flow_values.append(flow_usd)
+            # Extract flow data (last 90 days)
+            flow_values, = _extract_columns(data['data'][:2160], {'flow_usd': 0.0})
             
-            if not flow_values:
-                return LayerSignal("etf_flows", "none", 0, 0, timestamp=datetime.now())
+            if flow_values.size == 0:
+                return LayerSignal("etf_flows", "none", 0, 0, timestamp=ts)
             
-            # Store in buffer
+            # Store in buffer, which then holds all historical data
             etf_key = f"etf_flows_{symbol}"
-            for val in flow_values[:-1]:
-                self.data_buffer.add_data(etf_key, val)
-            
-            # Get all historical data
-            all_flows = self.data_buffer.get_data(etf_key) + flow_values
+            self.data_buffer.extend(etf_key, flow_values)
+            all_flows = self.data_buffer.get_array(etf_key)
             
             # Evaluate using pandas-based evaluator
             level, metadata = evaluate_etf_flows(all_flows, self.layer_config)
             
-            # Add latest value
-            self.data_buffer.add_data(etf_key, flow_values[-1])
-            
             return LayerSignal(
                 name="etf_flows",
                 level=level,
                 value=metadata.get("now", 0),
                 threshold_used=metadata.get("ma7", 0) * self.layer_config.etf_mult_action if level == "action" else 0,
                 metadata=metadata,
-                timestamp=datetime.now()
+                timestamp=ts
             )
             
         except Exception as e:
             logger.error(f"❌ ETF flows analysis failed: {e}")
-            return LayerSignal("etf_flows", "none", 0, 0, timestamp=datetime.now())
+            return LayerSignal("etf_flows", "none", 0, 0, timestamp=ts)
     
-    async def _check_liquidation_kill_switch(self, symbol: str, long_liq: float, short_liq: float):
+    async def _check_liquidation_kill_switch(self, symbol: str, long_liq: float, short_liq: float,
+                                             ts: Optional[datetime] = None):
         """Check for liquidation kill-switch condition"""
         try:
             if long_liq > short_liq * 2:  # Heavy long liquidations
                 self.kill_switch_active = True
-                self.kill_switch_until = datetime.now() + timedelta(minutes=30)
+                self.kill_switch_until = (ts or datetime.now()) + timedelta(minutes=30)
                 logger.warning(f"🚨 Kill-switch activated: Heavy long liquidations detected for {symbol}")
             elif short_liq > long_liq * 2:  # Heavy short liquidations  
                 self.kill_switch_active = True
-                self.kill_switch_until = datetime.now() + timedelta(minutes=30)
+                self.kill_switch_until = (ts or datetime.now()) + timedelta(minutes=30)
                 logger.warning(f"🚨 Kill-switch activated: Heavy short liquidations detected for {symbol}")
         except Exception as e:
             logger.error(f"❌ Kill-switch check failed: {e}")
     
     async def run_confluence_analysis(self, symbol: str) -> ConfluenceResult:
         """Run full confluence analysis with pandas-based evaluators"""
+        now = datetime.now()  # one timestamp for the whole analysis
+        start_time = time.perf_counter()
         try:
-            start_time = datetime.now()
-            
             # Check kill-switch status
-            if (self.kill_switch_until and datetime.now() < self.kill_switch_until):
+            if (self.kill_switch_until and now < self.kill_switch_until):
                 self.kill_switch_active = True
             else:
                 self.kill_switch_active = False
             
-            # Run all layer analyses in parallel
+            # Run all layer analyses in parallel, HTTP calls overlap in worker threads
             layer_tasks = [
-                self.analyze_institutional_bias(symbol),
-                self.analyze_funding_rate(symbol),
-                self.analyze_taker_ratio(symbol),
-                self.analyze_liquidation(symbol),
-                self.analyze_etf_flows("BTC")  # ETF is always BTC
+                self.analyze_institutional_bias(symbol, now),
+                self.analyze_funding_rate(symbol, now),
+                self.analyze_taker_ratio(symbol, now),
+                self.analyze_liquidation(symbol, now),
+                self.analyze_etf_flows("BTC", now)  # ETF is always BTC
             ]
             
             layer_results = await asyncio.gather(*layer_tasks)
@@ -382,17 +533,25 @@ class EnhancedSniperEngineV2:
                 liq_direction_conflict=self.kill_switch_active
             )
             
-            # Calculate confluence score (0-100)
-            triggered_layers = [s for s in layer_results if s.level != "none"]
-            watch_count = sum(1 for s in triggered_layers if s.level == "watch")
-            action_count = sum(1 for s in triggered_layers if s.level == "action")
+            # Count triggered layers by level in one pass
+            triggered_layers = []
+            watch_count = action_count = 0
+            for signal in layer_results:
+                if signal.level == "action":
+                    action_count += 1
+                elif signal.level == "watch":
+                    watch_count += 1
+                else:
+                    continue
+                triggered_layers.append(signal)
             
+            # Calculate confluence score (0-100)
             max_possible = len(layer_results) * 2  # 2 points per action signal
             actual_score = (watch_count * 1) + (action_count * 2)
             confluence_score = (actual_score / max_possible) * 100
             
             # Performance tracking
-            analysis_time = (datetime.now() - start_time).total_seconds()
+            analysis_time = time.perf_counter() - start_time
             self.last_analysis_time[symbol] = analysis_time
             
             logger.info(f"🎯 Confluence V2 {symbol}: {overall_level.upper()} (score: {confluence_score:.1f}%, {analysis_time:.3f}s) - Watch: {watch_count}, Action: {action_count}")
@@ -408,7 +567,7 @@ class EnhancedSniperEngineV2:
                     "action_count": action_count,
                     "layer_levels": layer_levels
                 },
-                timestamp=datetime.now()
+                timestamp=now
             )
             
         except Exception as e:
@@ -419,15 +578,18 @@ class EnhancedSniperEngineV2:
                 confluence_score=0,
                 kill_switch_active=self.kill_switch_active,
                 metadata={"error": str(e)},
-                timestamp=datetime.now()
+                timestamp=now
             )
 
-# Global engine instance
+# Global engine instance; the lock only guards the first build
 sniper_engine_v2 = None
+_engine_lock = threading.Lock()
 
 def get_enhanced_sniper_engine_v2() -> EnhancedSniperEngineV2:
     """Get singleton Enhanced Sniper Engine V2 instance"""
     global sniper_engine_v2
     if sniper_engine_v2 is None:
-        sniper_engine_v2 = EnhancedSniperEngineV2()
+        with _engine_lock:
+            if sniper_engine_v2 is None:
+                sniper_engine_v2 = EnhancedSniperEngineV2()
     return sniper_engine_v2
\ No newline at end of file
@@ -1,4 +1,5 @@
 import time, random, logging
+import orjson
 import requests
 from typing import Optional, Dict, Any
 
@@ -23,11 +24,24 @@ class RateLimitExceeded(HttpError):
         self.retry_after = retry_after
         super().__init__(429, f"Rate limit exceeded. Retry after: {retry_after}s")
 
+class OrjsonResponse(requests.Response):
+    """requests.Response that decodes JSON bodies with orjson"""
+    def json(self, **kwargs):
+        if kwargs:
+            return super().json(**kwargs)
+        return orjson.loads(self.content)
+
+def _use_orjson(response: requests.Response, *args, **kwargs) -> requests.Response:
+    """Session response hook: switch response.json() to the orjson decoder"""
+    response.__class__ = OrjsonResponse
+    return response
+
 class Http:
     def __init__(self, headers: Dict[str, str]):
         self.headers = headers
         self.session = requests.Session()
         self.session.headers.update(headers)
+        self.session.hooks['response'].append(_use_orjson)
 
     def get(self, url: str, params: Optional[Dict[str, Any]] = None, retries: int = MAX_RETRIES) -> requests.Response:
         """Enhanced GET method with proper error handling and exponential backoff"""
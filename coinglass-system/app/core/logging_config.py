@@ -4,45 +4,41 @@ Throttled logging configuration to reduce log noise
 
 import time
 import logging
-from typing import Dict, Tuple
+from collections import OrderedDict
+from typing import Tuple
 
 
 class ThrottleFilter(logging.Filter):
     """Throttle log messages to reduce spam"""
     
-    def __init__(self, ttl_seconds: float = 5.0):
+    def __init__(self, ttl_seconds: float = 5.0, max_entries: int = 1000):
         super().__init__()
         self.ttl = ttl_seconds
-        self._log_seen: Dict[str, float] = {}
+        self.max_entries = max_entries
+        # Ordered by last time each message was let through, oldest first
+        self._log_seen: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
     
     def filter(self, record: logging.LogRecord) -> bool:
         """Filter repeated log messages within TTL window"""
-        # Create unique key from logger name and message
-        msg = getattr(record, "msg", "")
-        if hasattr(record, "args") and record.args:
-            try:
-                msg = msg % record.args
-            except:
-                pass
-        
-        key = f"{record.name}:{msg}"
+        # Key on the unformatted template so the same call site throttles
+        # together whatever its arguments are
+        msg = record.msg
+        key = (record.name, msg if isinstance(msg, str) else str(msg))
         now = time.time()
         
         # Check if we've seen this message recently
-        last_seen = self._log_seen.get(key, 0)
-        if now - last_seen < self.ttl:
-            return False  # Filter out (don't log)
+        last_seen = self._log_seen.get(key)
+        if last_seen is not None:
+            if now - last_seen < self.ttl:
+                return False  # Filter out (don't log)
+            self._log_seen.move_to_end(key)
         
         # Update last seen time
         self._log_seen[key] = now
         
-        # Clean up old entries periodically
-        if len(self._log_seen) > 1000:
-            cutoff = now - self.ttl * 2
-            self._log_seen = {
-                k: v for k, v in self._log_seen.items() 
-                if v > cutoff
-            }
+        # Evict the least recently logged message once over capacity
+        if len(self._log_seen) > self.max_entries:
+            self._log_seen.popitem(last=False)
         
         return True  # Allow logging
 
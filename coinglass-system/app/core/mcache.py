@@ -5,80 +5,76 @@ Implements 250-500ms caching with request coalescing
 
 import time
 import asyncio
-from typing import Dict, Any, Optional, Tuple
+import weakref
+from typing import Dict, Any, Optional, Tuple, Union
 
-# Global cache and locks
-_cache: Dict[str, Dict[str, Any]] = {}
-_locks: Dict[str, asyncio.Lock] = {}
+CacheKey = Union[str, Tuple[str, Tuple[Tuple[str, Any], ...]]]
 
+# Global cache and locks; entries are (monotonic timestamp, data)
+_cache: Dict[CacheKey, Tuple[float, Any]] = {}
+# Locks disappear once no coroutine holds or waits on them
+_locks: "weakref.WeakValueDictionary[CacheKey, asyncio.Lock]" = weakref.WeakValueDictionary()
 
-def _key(path: str, params: Dict[str, Any]) -> str:
-    """Generate cache key from path and sorted params"""
+
+def _key(path: str, params: Dict[str, Any]) -> CacheKey:
+    """Generate cache key from path and sorted params
+    
+    Keys with params are (path, sorted items) tuples, so param values must be
+    hashable; keys only live in this process's dicts and are never rendered.
+    """
     if not params:
         return path
-    param_str = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
-    return f"{path}?{param_str}"
+    return (path, tuple(sorted(params.items())))
 
 
-async def singleflight(key: str) -> asyncio.Lock:
+async def singleflight(key: CacheKey) -> asyncio.Lock:
     """Get or create lock for singleflight pattern"""
-    if key not in _locks:
-        _locks[key] = asyncio.Lock()
+    lock = _locks.get(key)
+    if lock is None:
+        lock = _locks[key] = asyncio.Lock()
     
-    lock = _locks[key]
     await lock.acquire()
     return lock
 
 
-def get_cached(key: str, ttl_ms: int = 300) -> Optional[Any]:
+def get_cached(key: CacheKey, ttl_ms: int = 300) -> Optional[Any]:
     """Get cached data if still valid"""
     entry = _cache.get(key)
-    if not entry:
+    if entry is None:
         return None
     
-    if time.time() - entry["ts"] > ttl_ms / 1000:
+    ts, data = entry
+    if time.monotonic() - ts > ttl_ms * 0.001:
         # Remove expired entry
         _cache.pop(key, None)
         return None
     
-    return entry["data"]
+    return data
 
 
-def set_cached(key: str, data: Any, ttl=None, ttl_ms=None, **kwargs) -> None:
+def set_cached(key: CacheKey, data: Any, ttl=None, ttl_ms=None, **kwargs) -> None:
     """Store data in cache with current timestamp
     
     Args:
         key: Cache key
         data: Data to cache
-        ttl: TTL in seconds (optional)
+        ttl: TTL in seconds (accepted for compatibility, expiry is decided by the reader)
         ttl_ms: TTL in milliseconds (backward compatibility, optional)
         **kwargs: Additional parameters for compatibility
     """
-    # Backward-compat: jika ttl_ms diisi, konversi ke detik
-    if ttl is None and ttl_ms is not None:
-        try:
-            ttl = max(1, int(round(float(ttl_ms)/1000.0)))
-        except Exception:
-            ttl = 60  # fallback aman 60s
-    
-    _cache[key] = {
-        "ts": time.time(),
-        "data": data,
-        "ttl": ttl  # Store TTL for future use if needed
-    }
+    _cache[key] = (time.monotonic(), data)
 
 
 def cleanup_cache(max_age_seconds: float = 300) -> int:
     """Cleanup expired cache entries"""
-    now = time.time()
+    now = time.monotonic()
     expired_keys = [
-        key for key, entry in _cache.items()
-        if now - entry["ts"] > max_age_seconds
+        key for key, (ts, _) in _cache.items()
+        if now - ts > max_age_seconds
     ]
     
     for key in expired_keys:
         _cache.pop(key, None)
-        _locks.pop(key, None)
     
     return len(expired_keys)
 
@@ -1,11 +1,18 @@
+import asyncio
+import atexit
 import logging
-import json
+import logging.handlers
+import queue
+import sys
+import threading
 import time
-from typing import Dict, Any, Optional
+import numpy as np
+import orjson
+from typing import Dict, Any, List, Optional
+from collections import deque
 from datetime import datetime
 from functools import wraps
 from opentelemetry import trace
-from opentelemetry.exporter.jaeger.thrift import JaegerExporter
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -13,6 +20,75 @@ from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
 from opentelemetry.instrumentation.redis import RedisInstrumentor
 from app.core.settings import settings
 
+def _dumps(log_data: Dict[str, Any]) -> str:
+    """Serialize a log record with orjson; values it can't encode fall back to str()"""
+    return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that batches formatted records into one write
+    
+    Flushes once buf_size characters are pending, or flush_interval_ms after
+    the first buffered record, whichever comes first.
+    """
+    
+    def __init__(self, stream=None, buf_size: int = 64 * 1024, flush_interval_ms: int = 50):
+        super().__init__(stream)
+        self.buf_size = buf_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending: List[str] = []
+        self._pending_size = 0
+        self._timer: Optional[threading.Timer] = None
+    
+    def emit(self, record: logging.LogRecord):
+        # Handler.handle already holds self.lock here
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        self._pending.append(msg)
+        self._pending_size += len(msg)
+        if self._pending_size >= self.buf_size:
+            self._write_pending()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _write_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self.stream.write("".join(self._pending))
+            self._pending.clear()
+            self._pending_size = 0
+        self.stream.flush()
+    
+    def flush(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self._write_pending()
+        finally:
+            self.release()
+
+# One background sink for every StructuredLogger: callers only enqueue the
+# record, the listener thread formats and writes them in batches
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_sink = BufferedStreamHandler(sys.stderr)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_sink)
+_log_listener.start()
+
+@atexit.register
+def _stop_log_listener():
+    """Drain queued records and flush the buffered sink on shutdown"""
+    _log_listener.stop()
+    try:
+        _log_sink.flush()
+    except (OSError, ValueError):
+        pass  # stream already closed, as logging.shutdown tolerates too
+
 # Structured logging setup
 class StructuredLogger:
     """Enhanced structured logging with JSON format"""
@@ -20,45 +96,59 @@ class StructuredLogger:
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self._setup_logger()
+        self._write = self.logger.log
+        self._enabled = self.logger.isEnabledFor
     
     def _setup_logger(self):
         """Setup structured JSON logging"""
         if not self.logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = JSONFormatter()
-            handler.setFormatter(formatter)
-            self.logger.addHandler(handler)
+            self.logger.addHandler(logging.handlers.QueueHandler(_log_queue))
             self.logger.setLevel(getattr(logging, settings.LOG_LEVEL))
     
     def info(self, message: str, **kwargs):
-        self._log("INFO", message, **kwargs)
+        self._log(logging.INFO, "INFO", message, kwargs)
     
     def warning(self, message: str, **kwargs):
-        self._log("WARNING", message, **kwargs)
+        self._log(logging.WARNING, "WARNING", message, kwargs)
     
     def error(self, message: str, **kwargs):
-        self._log("ERROR", message, **kwargs)
+        self._log(logging.ERROR, "ERROR", message, kwargs)
     
     def debug(self, message: str, **kwargs):
-        self._log("DEBUG", message, **kwargs)
+        self._log(logging.DEBUG, "DEBUG", message, kwargs)
     
-    def _log(self, level: str, message: str, **kwargs):
+    def _log(self, level: int, level_name: str, message: str, fields: Dict[str, Any]):
+        # Skip building and serializing records the logger would drop anyway
+        if not self._enabled(level):
+            return
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": level,
+            "timestamp": datetime.utcnow(),  # orjson renders naive datetimes like isoformat()
+            "level": level_name,
             "message": message,
             "service": "coinglass-system",
-            **kwargs
+            **fields
         }
         
-        getattr(self.logger, level.lower())(json.dumps(log_data))
+        self._write(level, _dumps(log_data))
 
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logs"""
     
+    # (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last record, swapped as one tuple
+    _second_cache = (-1, "")
+    
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO timestamp; the date/time part is only formatted once per second"""
+        second = int(created)
+        cached_second, prefix = self._second_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1e6):06d}"
+    
     def format(self, record):
         log_data = {
-            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "message": record.getMessage(),
             "module": record.module,
@@ -69,7 +159,7 @@ class JSONFormatter(logging.Formatter):
         if hasattr(record, 'extra_data'):
             log_data.update(record.extra_data)
         
-        return json.dumps(log_data)
+        return _dumps(log_data)
 
 # Distributed Tracing
 class TracingManager:
@@ -89,13 +179,26 @@ class TracingManager:
         self.tracer_provider = TracerProvider()
         trace.set_tracer_provider(self.tracer_provider)
         
-        # Configure Jaeger exporter
-        jaeger_exporter = JaegerExporter(
-            agent_host_name="jaeger",
-            agent_port=6831,
+        # Export over OTLP/gRPC: one persistent HTTP/2 channel to the collector
+        # instead of per-span Thrift UDP packets (imported here, grpc is heavy)
+        import grpc
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        
+        span_exporter = OTLPSpanExporter(
+            endpoint=settings.OTLP_ENDPOINT,
+            insecure=True,
+            compression=grpc.Compression.Gzip
         )
         
-        span_processor = BatchSpanProcessor(jaeger_exporter)
+        # Larger queue with shorter delay and smaller batches: bursts are
+        # absorbed and full batches go out well before the next tick
+        span_processor = BatchSpanProcessor(
+            span_exporter,
+            max_queue_size=settings.OTEL_BSP_MAX_QUEUE_SIZE,
+            schedule_delay_millis=settings.OTEL_BSP_SCHEDULE_DELAY_MS,
+            max_export_batch_size=settings.OTEL_BSP_MAX_EXPORT_BATCH_SIZE,
+            export_timeout_millis=settings.OTEL_BSP_EXPORT_TIMEOUT_MS
+        )
         self.tracer_provider.add_span_processor(span_processor)
         
         # Get tracer
@@ -126,69 +229,94 @@ class TracingManager:
         return decorator
 
 # Performance Monitoring
+class _MetricSlot:
+    """Running totals for one operation; averages and percentiles are derived on read"""
+    
+    __slots__ = ("count", "total", "max", "min", "ok", "err", "samples", "lock")
+    
+    def __init__(self, sample_size: int = 1024):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.min = float('inf')
+        self.ok = 0
+        self.err = 0
+        self.samples: deque = deque(maxlen=sample_size)  # recent durations for percentiles
+        self.lock = threading.Lock()
+    
+    def as_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            samples = np.fromiter(self.samples, dtype=float, count=len(self.samples))
+            metric = {
+                "count": self.count,
+                "total_duration": self.total,
+                "avg_duration": self.total / self.count if self.count else 0,
+                "max_duration": self.max,
+                "min_duration": self.min,
+                "success_count": self.ok,
+                "error_count": self.err
+            }
+        p50, p95, p99 = np.percentile(samples, (50, 95, 99)) if samples.size else (0.0, 0.0, 0.0)
+        metric.update(p50_duration=float(p50), p95_duration=float(p95), p99_duration=float(p99))
+        return metric
+
 class PerformanceMonitor:
     """Application performance monitoring"""
     
     def __init__(self):
-        self.metrics = {}
+        self.metrics: Dict[str, _MetricSlot] = {}
         self.logger = StructuredLogger("performance")
     
     def time_operation(self, operation_name: str):
         """Decorator to time operation execution"""
         def decorator(func):
-            @wraps(func)
-            async def async_wrapper(*args, **kwargs):
-                start_time = time.time()
-                try:
-                    result = await func(*args, **kwargs)
-                    duration = time.time() - start_time
-                    self._record_metric(operation_name, duration, "success")
-                    return result
-                except Exception as e:
-                    duration = time.time() - start_time
-                    self._record_metric(operation_name, duration, "error")
-                    raise
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    start_ns = time.perf_counter_ns()
+                    status = "error"
+                    try:
+                        result = await func(*args, **kwargs)
+                        status = "success"
+                        return result
+                    finally:
+                        self._record_metric(operation_name, (time.perf_counter_ns() - start_ns) * 1e-9, status)
+                return async_wrapper
             
             @wraps(func)
             def sync_wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_ns = time.perf_counter_ns()
+                status = "error"
                 try:
                     result = func(*args, **kwargs)
-                    duration = time.time() - start_time
-                    self._record_metric(operation_name, duration, "success")
+                    status = "success"
                     return result
-                except Exception as e:
-                    duration = time.time() - start_time
-                    self._record_metric(operation_name, duration, "error")
-                    raise
-            
-            return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+                finally:
+                    self._record_metric(operation_name, (time.perf_counter_ns() - start_ns) * 1e-9, status)
+            return sync_wrapper
         return decorator
     
     def _record_metric(self, operation: str, duration: float, status: str):
         """Record performance metric"""
-        if operation not in self.metrics:
-            self.metrics[operation] = {
-                "count": 0,
-                "total_duration": 0,
-                "avg_duration": 0,
-                "max_duration": 0,
-                "min_duration": float('inf'),
-                "success_count": 0,
-                "error_count": 0
-            }
-        
-        metric = self.metrics[operation]
-        metric["count"] += 1
-        metric["total_duration"] += duration
-        metric["avg_duration"] = metric["total_duration"] / metric["count"]
-        metric["max_duration"] = max(metric["max_duration"], duration)
-        metric["min_duration"] = min(metric["min_duration"], duration)
+        metric = self.metrics.get(operation)
+        if metric is None:
+            # setdefault is atomic, so racing threads end up sharing one slot
+            metric = self.metrics.setdefault(operation, _MetricSlot())
         
-        if status == "success":
-            metric["success_count"] += 1
-        else:
-            metric["error_count"] += 1
+        # Per-operation lock: wrappers also run in to_thread/executor workers
+        with metric.lock:
+            metric.count += 1
+            metric.total += duration
+            if duration > metric.max:
+                metric.max = duration
+            if duration < metric.min:
+                metric.min = duration
+            metric.samples.append(duration)
+            
+            if status == "success":
+                metric.ok += 1
+            else:
+                metric.err += 1
         
         # Log slow operations
         if duration > 5.0:  # > 5 seconds
@@ -201,64 +329,86 @@ class PerformanceMonitor:
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics"""
-        return self.metrics.copy()
+        return {operation: metric.as_dict() for operation, metric in list(self.metrics.items())}
     
     def reset_metrics(self):
         """Reset performance metrics"""
         self.metrics.clear()
 
 # Business Metrics
+class _EventTemplate:
+    """One business event with its fixed fields pre-encoded
+    
+    Only the per-call fields go through orjson; they are spliced onto the
+    cached prefix instead of rebuilding the whole record every time.
+    """
+    
+    __slots__ = ("_prefix",)
+    
+    def __init__(self, message: str, event_type: str):
+        fixed = _dumps({"level": "INFO", "message": message, "service": "coinglass-system", "event_type": event_type})
+        self._prefix = fixed[:-1] + ","
+    
+    def render(self, fields: Dict[str, Any]) -> str:
+        return self._prefix + _dumps(fields)[1:]
+
 class BusinessMetricsCollector:
     """Collect business-specific metrics"""
     
+    _SIGNAL_GENERATED = _EventTemplate("Trading signal generated", "signal_generated")
+    _DATA_PROCESSED = _EventTemplate("Data processed", "data_processed")
+    _API_USAGE = _EventTemplate("API usage", "api_usage")
+    _ALERT_SENT = _EventTemplate("Alert sent", "alert_sent")
+    
     def __init__(self):
         self.logger = StructuredLogger("business_metrics")
+        self._write = self.logger.logger.info
+        self._enabled = self.logger.logger.isEnabledFor
     
     def record_signal_generated(self, signal_type: str, symbol: str, severity: str):
         """Record trading signal generation"""
-        self.logger.info(
-            "Trading signal generated",
-            event_type="signal_generated",
-            signal_type=signal_type,
-            symbol=symbol,
-            severity=severity
-        )
+        if self._enabled(logging.INFO):
+            self._write(self._SIGNAL_GENERATED.render({
+                "timestamp": datetime.utcnow(),
+                "signal_type": signal_type,
+                "symbol": symbol,
+                "severity": severity
+            }))
     
     def record_data_processed(self, data_type: str, count: int, processing_time: float):
         """Record data processing metrics"""
-        self.logger.info(
-            "Data processed",
-            event_type="data_processed",
-            data_type=data_type,
-            count=count,
-            processing_time=processing_time,
-            records_per_second=count / processing_time if processing_time > 0 else 0
-        )
+        if self._enabled(logging.INFO):
+            self._write(self._DATA_PROCESSED.render({
+                "timestamp": datetime.utcnow(),
+                "data_type": data_type,
+                "count": count,
+                "processing_time": processing_time,
+                "records_per_second": count / processing_time if processing_time > 0 else 0
+            }))
     
     def record_api_usage(self, user_id: str, endpoint: str, tier: str):
         """Record API usage for billing/analytics"""
-        self.logger.info(
-            "API usage",
-            event_type="api_usage",
-            user_id=user_id,
-            endpoint=endpoint,
-            tier=tier
-        )
+        if self._enabled(logging.INFO):
+            self._write(self._API_USAGE.render({
+                "timestamp": datetime.utcnow(),
+                "user_id": user_id,
+                "endpoint": endpoint,
+                "tier": tier
+            }))
     
     def record_alert_sent(self, alert_type: str, symbol: str, channel: str):
         """Record alert delivery"""
-        self.logger.info(
-            "Alert sent",
-            event_type="alert_sent",
-            alert_type=alert_type,
-            symbol=symbol,
-            channel=channel
-        )
+        if self._enabled(logging.INFO):
+            self._write(self._ALERT_SENT.render({
+                "timestamp": datetime.utcnow(),
+                "alert_type": alert_type,
+                "symbol": symbol,
+                "channel": channel
+            }))
 
 # Global instances
+_log_sink.setFormatter(JSONFormatter())
 structured_logger = StructuredLogger("coinglass")
 tracing_manager = TracingManager()
 performance_monitor = PerformanceMonitor()
 business_metrics = BusinessMetricsCollector()
-
-import asyncio
\ No newline at end of file
@@ -12,16 +12,7 @@ class RateLimiter:
         window = now // self.window_seconds
         redis_key = f"rate_limit:{key}:{window}"
         
-        try:
-            current = redis_client.get(redis_key)
-            if current is None:
-                redis_client.setex(redis_key, self.window_seconds, 1)
-                return True
-            
-            if int(current) >= self.max_requests:
-                return False
-            
-            redis_client.incr(redis_key)
-            return True
-        except Exception:
-            return True  # Fail open
\ No newline at end of file
+        # Single read-modify-write: increment and (re)arm the window TTL together
+        # instead of GET followed by SETEX/INCR
+        count = redis_client.increment(redis_key, ttl=self.window_seconds)
+        return count <= self.max_requests  # increment() returns 0 on store errors, so this fails open
@@ -12,16 +12,48 @@ All endpoints support Standard package (No-Limit).
 """
 
 import asyncio
+import functools
 import logging
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+
+from cachetools import TTLCache
 
 from app.core.coinglass_client import CoinglassClient
 from app.core.logging import logger
 
 
-@dataclass
+# Exchange reliability component of the confidence score (unlisted exchanges get 15)
+EXCHANGE_RELIABILITY_SCORES = {
+    'Binance': 25,
+    'OKX': 24,
+    'Bybit': 23,
+    'HTX': 20,
+    'Bitget': 18
+}
+
+# Common symbol mapping untuk REST API calls
+SYMBOL_MAP = {
+    'WBTC': 'BTC',
+    'WETH': 'ETH',
+    'USDC': 'USDC',
+    'USDT': 'USDT'
+}
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_coin_symbol(base_asset: str) -> str:
+    """Normalize coin symbol untuk REST API calls (base assets repeat heavily, so results are cached)"""
+    coin = base_asset.upper()
+    
+    # Handle special cases
+    if coin.startswith('1000'):
+        coin = coin[4:]  # 1000BONK -> BONK
+    
+    return SYMBOL_MAP.get(coin, coin)
+
+
+@dataclass(slots=True)
 class LiquidationEvent:
     """Parsed liquidation event dari WebSocket"""
     base_asset: str
@@ -35,6 +67,19 @@ class LiquidationEvent:
     @classmethod
     def from_ws_data(cls, ws_event: Dict[str, Any]) -> 'LiquidationEvent':
         """Parse WebSocket event data ke LiquidationEvent object"""
+        try:
+            # Fast path: event lengkap (kasus normal dari WebSocket)
+            return cls(
+                base_asset=ws_event['baseAsset'],
+                exchange=ws_event['exName'],
+                symbol=ws_event['symbol'],
+                price=float(ws_event['price']),
+                side=int(ws_event['side']),
+                vol_usd=float(ws_event['volUsd']),
+                timestamp=int(ws_event['time'])
+            )
+        except KeyError:
+            pass
         return cls(
             base_asset=ws_event.get('baseAsset', ''),
             exchange=ws_event.get('exName', ''),
@@ -46,7 +91,7 @@ class LiquidationEvent:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class VerificationResult:
     """Result dari REST verification"""
     success: bool
@@ -76,9 +121,9 @@ class RestVerificationEngine:
         self.min_volume_threshold = 50000  # $50k minimum untuk verification
         self.confidence_threshold = 70  # 70% confidence untuk trigger alert
         
-        # Rate limiting
-        self.verification_cache: Dict[str, Dict] = {}
+        # Rate limiting (expired/oldest entries are evicted by the cache itself)
         self.cache_duration = 300  # 5 minutes cache
+        self.verification_cache: TTLCache = TTLCache(maxsize=10_000, ttl=self.cache_duration)
         
     async def verify_liquidation_event(self, event: LiquidationEvent) -> VerificationResult:
         """
@@ -108,11 +153,10 @@ class RestVerificationEngine:
             
             # Check cache untuk avoid duplicate verification
             cache_key = f"{event.base_asset}_{event.exchange}_{int(event.timestamp/60000)}"  # 1-minute buckets
-            if cache_key in self.verification_cache:
-                cached_result = self.verification_cache[cache_key]
-                if datetime.now().timestamp() - cached_result['timestamp'] < self.cache_duration:
-                    logger.debug(f"📋 Using cached verification for {cache_key}")
-                    return cached_result['result']
+            cached_result = self.verification_cache.get(cache_key)
+            if cached_result is not None:
+                logger.debug(f"📋 Using cached verification for {cache_key}")
+                return cached_result
             
             # Fetch REST verification data
             verification_data = await self._fetch_verification_data(event)
@@ -136,10 +180,7 @@ class RestVerificationEngine:
             )
             
             # Cache result
-            self.verification_cache[cache_key] = {
-                'timestamp': datetime.now().timestamp(),
-                'result': result
-            }
+            self.verification_cache[cache_key] = result
             
             # Log verification summary
             logger.info(f"✅ Verification complete: {event.base_asset} confidence={confidence_score:.1f}% alerts={len(alerts)}")
@@ -166,46 +207,29 @@ class RestVerificationEngine:
         - Funding (pair OHLC): Standard, No-Limit
         - Liquidation (coin-agg): Standard, No-Limit
         """
-        verification_data = {}
-        
         # Extract coin dari base_asset (remove numbers, etc.)
         coin = self._normalize_coin_symbol(event.base_asset)
         
-        try:
-            # 1. Taker Buy/Sell Volume (coin-aggregated)
-            taker_data = await self._fetch_taker_volume(coin)
-            verification_data['taker'] = taker_data
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Taker data fetch failed for {coin}: {e}")
-            verification_data['taker'] = {}
-            
-        try:
-            # 2. Open Interest (aggregated OHLC)
-            oi_data = await self._fetch_open_interest(coin)
-            verification_data['open_interest'] = oi_data
-            
-        except Exception as e:
-            logger.warning(f"⚠️ OI data fetch failed for {coin}: {e}")
-            verification_data['open_interest'] = {}
-            
-        try:
-            # 3. Funding Rate (pair OHLC)
-            funding_data = await self._fetch_funding_rate(event.symbol, event.exchange)
-            verification_data['funding'] = funding_data
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Funding data fetch failed for {event.symbol}: {e}")
-            verification_data['funding'] = {}
-            
-        try:
-            # 4. Liquidation History (coin-aggregated)
-            liq_data = await self._fetch_liquidation_history(coin)
-            verification_data['liquidation'] = liq_data
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Liquidation history fetch failed for {coin}: {e}")
-            verification_data['liquidation'] = {}
+        # Keempat endpoint independen, jadi round-trip dijalankan bersamaan
+        results = await asyncio.gather(
+            self._fetch_taker_volume(coin),                                 # 1. Taker (coin-aggregated)
+            self._fetch_open_interest(coin),                                # 2. OI (aggregated OHLC)
+            self._fetch_funding_rate(event.symbol, event.exchange),         # 3. Funding (pair OHLC)
+            self._fetch_liquidation_history(coin),                          # 4. Liquidation (coin-aggregated)
+            return_exceptions=True
+        )
+        
+        verification_data = {}
+        for key, label, result in zip(
+            ('taker', 'open_interest', 'funding', 'liquidation'),
+            (f"Taker data fetch failed for {coin}", f"OI data fetch failed for {coin}",
+             f"Funding data fetch failed for {event.symbol}", f"Liquidation history fetch failed for {coin}"),
+            results
+        ):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ {label}: {result}")
+                result = {}
+            verification_data[key] = result
             
         return verification_data
     
@@ -213,7 +237,8 @@ class RestVerificationEngine:
         """Fetch aggregated taker buy/sell volume history"""
         try:
             # Standard package, No-Limit
-            result = self.coinglass_client.taker_buysell_volume_aggregated(
+            result = await asyncio.to_thread(
+                self.coinglass_client.taker_buysell_volume_aggregated,
                 coin=coin,
                 interval='1h'
             )
@@ -226,7 +251,7 @@ class RestVerificationEngine:
         """Fetch aggregated open interest OHLC data"""
         try:
             # Standard package, No-Limit  
-            result = self.coinglass_client.oi_ohlc(coin, '1h')
+            result = await asyncio.to_thread(self.coinglass_client.oi_ohlc, coin, '1h')
             return result
         except Exception as e:
             logger.debug(f"OI fetch error for {coin}: {e}")
@@ -236,7 +261,8 @@ class RestVerificationEngine:
         """Fetch funding rate OHLC data"""
         try:
             # Standard package, No-Limit
-            result = self.coinglass_client.funding_rate(
+            result = await asyncio.to_thread(
+                self.coinglass_client.funding_rate,
                 symbol=symbol.replace('USDT', '').replace('-USDT-SWAP', ''),  # Clean symbol
                 exchange=exchange.lower(),
                 interval='8h'  # Funding rate typically 8h
@@ -250,7 +276,8 @@ class RestVerificationEngine:
         """Fetch coin-aggregated liquidation history"""
         try:
             # Standard package, No-Limit
-            result = self.coinglass_client.liquidation_history_coin(
+            result = await asyncio.to_thread(
+                self.coinglass_client.liquidation_history_coin,
                 symbol=coin,
                 interval='1h'
             )
@@ -261,22 +288,7 @@ class RestVerificationEngine:
     
     def _normalize_coin_symbol(self, base_asset: str) -> str:
         """Normalize coin symbol untuk REST API calls"""
-        # Remove common prefixes/suffixes
-        coin = base_asset.upper()
-        
-        # Handle special cases
-        if coin.startswith('1000'):
-            coin = coin[4:]  # 1000BONK -> BONK
-        
-        # Map common symbols
-        symbol_map = {
-            'WBTC': 'BTC',
-            'WETH': 'ETH',
-            'USDC': 'USDC',
-            'USDT': 'USDT'
-        }
-        
-        return symbol_map.get(coin, coin)
+        return normalize_coin_symbol(base_asset)
     
     def _calculate_confidence_score(self, event: LiquidationEvent, verification_data: Dict[str, Any]) -> float:
         """
@@ -290,56 +302,44 @@ class RestVerificationEngine:
         """
         score = 0.0
         
+        # Bind the nested payloads once instead of re-walking .get chains
+        liq_data = (verification_data.get('liquidation') or {}).get('data') or ()
+        oi_data = (verification_data.get('open_interest') or {}).get('data') or ()
+        
         # Data availability score (25%)
-        data_sources = ['taker', 'open_interest', 'funding', 'liquidation']
+        data_sources = ('taker', 'open_interest', 'funding', 'liquidation')
         available_sources = sum(1 for source in data_sources if verification_data.get(source))
         data_score = (available_sources / len(data_sources)) * 25
         score += data_score
         
         # Volume consistency score (25%)
         volume_score = 0
-        if verification_data.get('liquidation', {}).get('data'):
+        if liq_data:
             # Check if liquidation volume aligns dengan recent history
-            recent_volumes = [
-                item.get('vol', 0) for item in verification_data['liquidation']['data'][-5:]
-            ]
-            if recent_volumes:
-                avg_volume = sum(recent_volumes) / len(recent_volumes)
-                if avg_volume > 0:
-                    # Score berdasarkan relative volume size
-                    volume_ratio = event.vol_usd / avg_volume
-                    if volume_ratio > 2:  # 2x above average
-                        volume_score = 25
-                    elif volume_ratio > 1.5:  # 1.5x above average
-                        volume_score = 20
-                    elif volume_ratio > 1:  # Above average
-                        volume_score = 15
-                    else:
-                        volume_score = 10
+            recent_volumes = [item.get('vol', 0) for item in liq_data[-5:]]
+            avg_volume = sum(recent_volumes) / len(recent_volumes)
+            if avg_volume > 0:
+                # Score berdasarkan relative volume size
+                volume_ratio = event.vol_usd / avg_volume
+                if volume_ratio > 2:  # 2x above average
+                    volume_score = 25
+                elif volume_ratio > 1.5:  # 1.5x above average
+                    volume_score = 20
+                elif volume_ratio > 1:  # Above average
+                    volume_score = 15
+                else:
+                    volume_score = 10
         score += volume_score
         
         # Market trend alignment score (25%)
         trend_score = 15  # Default moderate score
-        if verification_data.get('open_interest', {}).get('data'):
-            # Simplified trend analysis
-            oi_data = verification_data['open_interest']['data']
-            if len(oi_data) >= 2:
-                recent_oi = oi_data[-1].get('o', 0)
-                prev_oi = oi_data[-2].get('o', 0)
-                if recent_oi > prev_oi:  # OI increasing
-                    trend_score = 25
+        # Simplified trend analysis
+        if len(oi_data) >= 2 and oi_data[-1].get('o', 0) > oi_data[-2].get('o', 0):  # OI increasing
+            trend_score = 25
         score += trend_score
         
         # Exchange reliability score (25%)
-        exchange_scores = {
-            'Binance': 25,
-            'OKX': 24,
-            'Bybit': 23,
-            'HTX': 20,
-            'Bitget': 18
-        }
-        exchange_score = exchange_scores.get(event.exchange, 15)
-        score += exchange_score
+        score += EXCHANGE_RELIABILITY_SCORES.get(event.exchange, 15)
         
         return min(100.0, score)
     
@@ -365,7 +365,8 @@ class RestVerificationEngine:
             if len(oi_data) >= 3:
                 # Check for unusual OI patterns
                 recent_oi = [item.get('o', 0) for item in oi_data[-3:]]
-                if max(recent_oi) - min(recent_oi) > max(recent_oi) * 0.1:  # 10% OI change
+                oi_high = max(recent_oi)
+                if oi_high - min(recent_oi) > oi_high * 0.1:  # 10% OI change
                     alerts.append(f"📊 OI Divergence: {event.base_asset} showing unusual open interest patterns")
         
         return alerts
@@ -29,35 +29,44 @@ def setup_security_middleware(app: FastAPI):
         expose_headers=["X-RateLimit-Remaining", "X-RateLimit-Reset"]
     )
     
-    # Session middleware
+    # Session middleware (every worker must sign with the same key, so prod requires SESSION_SECRET)
+    if settings.ENV == "prod" and not settings.SESSION_SECRET:
+        raise ValueError("SESSION_SECRET must be set in production")
     app.add_middleware(
         SessionMiddleware, 
-        secret_key=secrets.token_urlsafe(32)
+        secret_key=settings.SESSION_SECRET or secrets.token_urlsafe(32),
+        same_site="lax",
+        https_only=settings.ENV == "prod"
     )
 
 class SecurityHeaders:
     """Security headers middleware"""
     
+    # Encoded once; our values replace any same-named header from the app
+    _SECURITY_HEADERS = [
+        (b"x-content-type-options", b"nosniff"),
+        (b"x-frame-options", b"DENY"),
+        (b"x-xss-protection", b"1; mode=block"),
+        (b"strict-transport-security", b"max-age=31536000; includeSubDomains"),
+        (b"content-security-policy", b"default-src 'self'"),
+        (b"referrer-policy", b"strict-origin-when-cross-origin")
+    ]
+    _SECURITY_HEADER_NAMES = frozenset(name for name, _ in _SECURITY_HEADERS)
+    
     def __init__(self, app: FastAPI):
         self.app = app
     
     async def __call__(self, scope, receive, send):
         async def send_with_headers(message):
             if message["type"] == "http.response.start":
-                headers = dict(message.get("headers", []))
-                
-                # Security headers
-                security_headers = {
-                    b"x-content-type-options": b"nosniff",
-                    b"x-frame-options": b"DENY",
-                    b"x-xss-protection": b"1; mode=block",
-                    b"strict-transport-security": b"max-age=31536000; includeSubDomains",
-                    b"content-security-policy": b"default-src 'self'",
-                    b"referrer-policy": b"strict-origin-when-cross-origin"
-                }
-                
-                headers.update(security_headers)
-                message["headers"] = list(headers.items())
+                # Extend the app's header list in place; only rebuild it when it
+                # already carries one of our headers (or isn't a list)
+                headers = message.setdefault("headers", [])
+                if not isinstance(headers, list) or any(name in self._SECURITY_HEADER_NAMES for name, _ in headers):
+                    headers = message["headers"] = [
+                        header for header in headers if header[0] not in self._SECURITY_HEADER_NAMES
+                    ]
+                headers.extend(self._SECURITY_HEADERS)
             
             await send(message)
         
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import List
+from functools import lru_cache
 import secrets
 import os
 
@@ -8,7 +9,7 @@ class Settings(BaseSettings):
     # API Configuration
     CG_API_KEY: str
     COINAPI_KEY: str = ""  # CoinAPI key for real-time price data
-    DB_URL: str = os.getenv("DATABASE_URL", "sqlite:///./coinglass.db")  # Use Replit PostgreSQL
+    DB_URL: str = Field(default_factory=lambda: os.getenv("DATABASE_URL", "sqlite:///./coinglass.db"))  # Use Replit PostgreSQL
     REDIS_URL: str = "redis://localhost:6379"  # Will be replaced with ReplDB
     TELEGRAM_BOT_TOKEN: str = ""  # Optional
     TELEGRAM_CHAT_ID: str = ""  # Optional
@@ -22,7 +23,8 @@ class Settings(BaseSettings):
     ENV: str = "dev"
     
     # Security Configuration
-    JWT_SECRET_KEY: str = secrets.token_urlsafe(32)
+    JWT_SECRET_KEY: str = Field(default_factory=lambda: secrets.token_urlsafe(32))  # Only drawn when not set in env
+    SESSION_SECRET: str = ""  # Shared across workers; required in prod
     ALLOWED_HOSTS: List[str] = ["*"]
     CORS_ORIGINS: List[str] = ["*"]
     
@@ -31,6 +33,10 @@ class Settings(BaseSettings):
     DB_MAX_OVERFLOW: int = 30
     DB_POOL_PRE_PING: bool = True
     DB_POOL_RECYCLE: int = 3600
+    DB_QUERY_CACHE_SIZE: int = 1024
+    DB_PREPARE_THRESHOLD: int = 1  # psycopg 3 only: prepare after N executions
+    DB_SLOW_QUERY_LOGGING: bool = False  # Per-statement timing; prefer PG log_min_duration_statement
+    DB_SLOW_QUERY_SECONDS: float = 1.0
     
     # Cache Configuration
     REDIS_MAX_CONNECTIONS: int = 100
@@ -40,11 +46,18 @@ class Settings(BaseSettings):
     WORKER_CONCURRENCY: int = 4
     BATCH_SIZE: int = 1000
     MAX_RETRIES: int = 3
+    WRITER_FLUSH_ROWS: int = 5000
+    WRITER_FLUSH_INTERVAL_MS: int = 1000
     
     # Monitoring Configuration
     LOG_LEVEL: str = "INFO"
     METRICS_ENABLED: bool = True
     TRACING_ENABLED: bool = True
+    OTLP_ENDPOINT: str = "http://jaeger:4317"  # OTLP/gRPC collector
+    OTEL_BSP_MAX_QUEUE_SIZE: int = 8192  # Absorb liquidation bursts instead of dropping spans
+    OTEL_BSP_SCHEDULE_DELAY_MS: int = 1000
+    OTEL_BSP_MAX_EXPORT_BATCH_SIZE: int = 256
+    OTEL_BSP_EXPORT_TIMEOUT_MS: int = 10000
     
     # Business Configuration
     SIGNAL_COOLDOWN_MINUTES: int = 5
@@ -54,7 +67,7 @@ class Settings(BaseSettings):
     # CoinGlass Tier Configuration
     CG_TIER: str = Field(default="standard", description="CoinGlass subscription tier: standard, pro, enterprise")
 
-    model_config = {"env_file": ".env", "case_sensitive": False, "extra": "ignore"}
+    model_config = {"env_file": ".env", "case_sensitive": False, "extra": "ignore", "frozen": True}
 
     def __init__(self, **kwargs):
         # Map COINGLASS_API_KEY to CG_API_KEY for backward compatibility if needed
@@ -62,4 +75,9 @@ class Settings(BaseSettings):
             os.environ['CG_API_KEY'] = os.environ['COINGLASS_API_KEY']
         super().__init__(**kwargs)
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Parse the environment once and share the validated Settings"""
+    return Settings()
+
+settings = get_settings()
\ No newline at end of file
@@ -3,16 +3,42 @@ Sniper Timing (5m) Engine - Institutional-grade LONG/SHORT signals
 Based on CoinGlass v4 aggregated taker volume + funding + OI + orderbook
 """
 
+import threading
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from cachetools import TTLCache
 from .coinglass_client import CoinglassClient
 
+# Response TTLs: hourly taker/funding bars move slowly, orderbook snapshots faster
+SLOW_ENDPOINT_TTL_SECONDS = 60
+ORDERBOOK_TTL_SECONDS = 15
+MAX_SCAN_WORKERS = 8  # Coins analysed concurrently by multi_coin_scan
+
 
 class SniperTimingEngine:
     """5-minute institutional flow analysis for precise entry signals"""
     
     def __init__(self):
         self.client = CoinglassClient()
+        # Keyed by (endpoint, coin, exchange, interval)
+        self._slow_cache: TTLCache = TTLCache(maxsize=256, ttl=SLOW_ENDPOINT_TTL_SECONDS)
+        self._orderbook_cache: TTLCache = TTLCache(maxsize=256, ttl=ORDERBOOK_TTL_SECONDS)
+        self._cache_lock = threading.Lock()  # TTLCache itself isn't thread-safe
+    
+    def _cached_fetch(self, cache: TTLCache, key: Tuple, fetch: Callable[[], Any]) -> Any:
+        """Return a cached response for key, calling fetch on a miss (only real data is cached)"""
+        with self._cache_lock:
+            cached = cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = fetch()
+        # Error bodies, empty payloads and the client's minimal fallback must not pin the TTL
+        if isinstance(result, dict) and result.get('data') and not result.get('fallback'):
+            with self._cache_lock:
+                cache[key] = result
+        return result
         
     def calculate_taker_dominance(self, taker_data: List[Dict]) -> float:
         """Calculate TakerDominance = buy_usd / (buy_usd + sell_usd) - Works with pair-level data"""
@@ -82,9 +108,20 @@ class SniperTimingEngine:
         """
         try:
             # Use CONFIRMED WORKING endpoints only
-            taker_data = self.client.taker_buysell_volume(coin, exchange, "1h")  # Working: $124M+ data
-            funding_data = self.client.funding_rate(f"{coin}USDT", "1h", exchange)  # Working method
-            orderbook_data = self.client.futures_orderbook_askbids_history(f"{coin}USDT", exchange)  # Working: $M liquidity
+            # The three endpoints are independent, so their round-trips overlap
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                taker_future = executor.submit(  # Working: $124M+ data
+                    self._cached_fetch, self._slow_cache, ("taker_volume", coin, exchange, "1h"),
+                    lambda: self.client.taker_buysell_volume(coin, exchange, "1h"))
+                funding_future = executor.submit(  # Working method
+                    self._cached_fetch, self._slow_cache, ("funding_rate", coin, exchange, "1h"),
+                    lambda: self.client.funding_rate(f"{coin}USDT", "1h", exchange))
+                orderbook_future = executor.submit(  # Working: $M liquidity
+                    self._cached_fetch, self._orderbook_cache, ("orderbook", coin, exchange, None),
+                    lambda: self.client.futures_orderbook_askbids_history(f"{coin}USDT", exchange))
+            taker_data = taker_future.result()
+            funding_data = funding_future.result()
+            orderbook_data = orderbook_future.result()
             
             # Extract data arrays (handle both direct data and nested structures)
             taker_array = taker_data.get('data', []) if isinstance(taker_data, dict) else []
@@ -173,15 +210,30 @@ class SniperTimingEngine:
     
     def multi_coin_scan(self, coins: List[str] = ["BTC", "ETH", "SOL"]) -> List[Dict]:
         """Scan multiple coins for sniper signals simultaneously"""
-        results = []
+        if not coins:
+            return []
         
-        for coin in coins:
-            # Simplified: skip pre-validation, just try the analysis
-            signal_result = self.analyze_sniper_signals(coin)
-            results.append(signal_result)
+        # Simplified: skip pre-validation, just try the analysis
+        # Each analysis waits on the network, so coins are scanned in parallel
+        with ThreadPoolExecutor(max_workers=min(len(coins), MAX_SCAN_WORKERS)) as executor:
+            results = list(executor.map(self.analyze_sniper_signals, coins))
         
         # Sort by confidence (highest first)
         valid_signals = [r for r in results if r.get('confidence', 0) > 0 and r.get('signal') != 'ERROR']
         valid_signals.sort(key=lambda x: x.get('confidence', 0), reverse=True)
         
-        return valid_signals + [r for r in results if r.get('confidence', 0) == 0 or r.get('signal') == 'ERROR']
\ No newline at end of file
+        return valid_signals + [r for r in results if r.get('confidence', 0) == 0 or r.get('signal') == 'ERROR']
+
+
+# Global instance: one client (and its response caches) shared by every request
+sniper_timing_engine = None
+_engine_lock = threading.Lock()
+
+def get_sniper_timing_engine() -> SniperTimingEngine:
+    """Get singleton Sniper Timing Engine instance"""
+    global sniper_timing_engine
+    if sniper_timing_engine is None:
+        with _engine_lock:
+            if sniper_timing_engine is None:
+                sniper_timing_engine = SniperTimingEngine()
+    return sniper_timing_engine
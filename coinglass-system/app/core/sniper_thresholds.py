@@ -25,12 +25,37 @@ def rolling_percentile(
         min_periods = max(1, min(window, len(s)))
     return s.rolling(window, min_periods=min_periods).quantile(q)
 
+def window_quantiles(
+    values: Sequence[float],
+    qs: Sequence[float],      # 0..1 each
+    window: int,
+) -> np.ndarray:
+    """
+    Several quantiles of the trailing window in one pass, i.e.
+    rolling_percentile(..., q).iloc[-1] for every q without computing every
+    earlier window. np.quantile partitions the window once (O(W)) for all qs.
+    NaN anywhere in the window gives NaN, matching min_periods = window.
+    """
+    tail = np.asarray(values, dtype="float64")[-window:]
+    if tail.size == 0 or np.isnan(tail).any():
+        return np.full(len(qs), np.nan)
+    return np.quantile(tail, qs)
+
+def window_quantile(values: Sequence[float], q: float, window: int) -> float:
+    """Single-quantile form of window_quantiles."""
+    return float(window_quantiles(values, (q,), window)[0])
+
 def ma(values, window: int, min_periods: Optional[int] = None) -> pd.Series:
     s = pd.Series(values, dtype="float64")
     if min_periods is None:
         min_periods = max(1, min(window, len(s)))
     return s.rolling(window, min_periods=min_periods).mean()
 
+def window_mean(values: Sequence[float], window: int) -> float:
+    """ma(values, window).iloc[-1] tanpa rolling pass: mean dari trailing window saja."""
+    tail = np.asarray(values, dtype="float64")[-window:]
+    return float(tail.mean()) if tail.size else math.nan
+
 # ---------- Funding utils ----------
 
 def normalize_funding_to_bps_per_8h(
@@ -112,8 +137,12 @@ class ConfluenceConfig:
 # ---------- Evaluators per-layer ----------
 
 def evaluate_bias(score_now: float, hist_scores: Sequence[float], cfg: LayerConfig) -> str:
-    s = pd.Series(hist_scores, dtype="float64")
-    mu, sd = float(s.mean()), float(s.std(ddof=1)) if len(s) > 1 else (0.0, 1.0)
+    s = np.asarray(hist_scores, dtype="float64")
+    # Conditional expression harus membungkus kedua nilai; jika tidak, sd jadi tuple saat histori pendek
+    if s.size > 1:
+        mu, sd = float(s.mean()), float(s.std(ddof=1))
+    else:
+        mu, sd = 0.0, 1.0
     z = 0.0 if sd == 0 else (score_now - mu) / sd
     if abs(z) >= cfg.bias_z_action or abs(score_now) >= cfg.bias_abs_action:
         return "action"
@@ -124,13 +153,15 @@ def evaluate_bias(score_now: float, hist_scores: Sequence[float], cfg: LayerConf
 def evaluate_funding(
     funding_series: Sequence[float],    # deret funding (desimal per bar timeframenya)
     interval_hours: float,
-    cfg: LayerConfig
+    cfg: LayerConfig,
+    quantiles: Optional[Sequence[float]] = None,   # (p85, p95) dari state incremental, jika ada
 ) -> Tuple[str, Dict]:
-    # Konversi semua ke bps per 8h
-    bps8 = [normalize_funding_to_bps_per_8h(x, interval_hours) for x in funding_series]
-    p85 = rolling_percentile(bps8, cfg.fund_p_watch, cfg.fund_lookback).iloc[-1]
-    p95 = rolling_percentile(bps8, cfg.fund_p_action, cfg.fund_lookback).iloc[-1]
-    now_bps8 = bps8[-1]
+    # Konversi semua ke bps per 8h (satu multiply vektor, rumus normalize_funding_to_bps_per_8h)
+    bps8 = np.asarray(funding_series, dtype="float64") * (8.0 / max(1e-9, float(interval_hours))) * 1e4
+    if quantiles is None:
+        quantiles = window_quantiles(bps8, (cfg.fund_p_watch, cfg.fund_p_action), cfg.fund_lookback).tolist()
+    p85, p95 = quantiles
+    now_bps8 = float(bps8[-1])
     level = "none"
     if abs(now_bps8) >= (p95 if not math.isnan(p95) else cfg.fund_abs_action_bps) or abs(now_bps8) >= cfg.fund_abs_action_bps:
         level = "action"
@@ -148,25 +179,32 @@ def evaluate_oi_roc(
     oi_now, oi_prev = oi_series[-1], oi_series[-2]
     px_now, px_prev = price_series[-1], price_series[-2]
     r = roc(oi_now, oi_prev)
-    same_dir_up = (px_now > px_prev and r >= cfg.oi_roc_watch)
-    same_dir_up_strong = (px_now > px_prev and r >= cfg.oi_roc_action)
-    same_dir_down = (px_now < px_prev and r <= -cfg.oi_roc_watch)
-    same_dir_down_strong = (px_now < px_prev and r <= -cfg.oi_roc_action)
-    if same_dir_up_strong or same_dir_down_strong:
-        return "action", {"roc": r, "price_up": px_now > px_prev}
-    if same_dir_up or same_dir_down:
-        return "watch",  {"roc": r, "price_up": px_now > px_prev}
-    return "none", {"roc": r, "price_up": px_now > px_prev}
+    price_up, price_down = px_now > px_prev, px_now < px_prev
+    # OI searah harga: |roc| bertanda sesuai arah harga
+    directional_roc = r if price_up else (-r if price_down else -math.inf)
+    if directional_roc >= cfg.oi_roc_action:
+        level = "action"
+    elif directional_roc >= cfg.oi_roc_watch:
+        level = "watch"
+    else:
+        level = "none"
+    return level, {"roc": r, "price_up": price_up}
 
 def evaluate_taker_ratio(
     buy_series: Sequence[float],
     sell_series: Sequence[float],
-    cfg: LayerConfig
+    cfg: LayerConfig,
+    quantiles: Optional[Sequence[float]] = None,   # (p85, p95) dari state incremental, jika ada
 ) -> Tuple[str, Dict]:
-    ratios = [taker_ratio(b, s) for b, s in zip(buy_series, sell_series)]
-    now = ratios[-1]
-    p85 = rolling_percentile(ratios, cfg.taker_p_watch, cfg.taker_lookback).iloc[-1]
-    p95 = rolling_percentile(ratios, cfg.taker_p_action, cfg.taker_lookback).iloc[-1]
+    n = min(len(buy_series), len(sell_series))
+    buy = np.asarray(buy_series, dtype="float64")[:n]
+    sell = np.asarray(sell_series, dtype="float64")[:n]
+    # Vektor dari taker_ratio; fmax (bukan maximum) agar sell NaN -> 1e-12 seperti max() skalar
+    ratios = buy / np.fmax(sell, 1e-12)
+    now = float(ratios[-1])
+    if quantiles is None:
+        quantiles = window_quantiles(ratios, (cfg.taker_p_watch, cfg.taker_p_action), cfg.taker_lookback).tolist()
+    p85, p95 = quantiles
 
     # Absolute first, then percentile fallback
     if now >= cfg.taker_abs_action_hi or now <= cfg.taker_abs_action_lo or \
@@ -182,12 +220,15 @@ def evaluate_taker_ratio(
 def evaluate_liquidation_coin_agg(
     long_series_usd: Sequence[float],
     short_series_usd: Sequence[float],
-    cfg: LayerConfig
+    cfg: LayerConfig,
+    quantiles: Optional[Sequence[float]] = None,   # (p95, p99) dari state incremental, jika ada
 ) -> Tuple[str, Dict]:
-    total = [float(l + s) for l, s in zip(long_series_usd, short_series_usd)]
-    now = total[-1]
-    p95 = rolling_percentile(total, cfg.liq_p_watch, cfg.liq_lookback).iloc[-1]
-    p99 = rolling_percentile(total, cfg.liq_p_action, cfg.liq_lookback).iloc[-1]
+    n = min(len(long_series_usd), len(short_series_usd))
+    total = np.asarray(long_series_usd, dtype="float64")[:n] + np.asarray(short_series_usd, dtype="float64")[:n]
+    now = float(total[-1])
+    if quantiles is None:
+        quantiles = window_quantiles(total, (cfg.liq_p_watch, cfg.liq_p_action), cfg.liq_lookback).tolist()
+    p95, p99 = quantiles
     if (not math.isnan(p99)) and now >= p99:
         return "action", {"now": now, "p95": p95, "p99": p99}
     if (not math.isnan(p95)) and now >= p95:
@@ -198,10 +239,10 @@ def evaluate_etf_flows(
     flow_usd_series: Sequence[float],
     cfg: LayerConfig
 ) -> Tuple[str, Dict]:
-    flow_list = list(flow_usd_series)
-    ma7 = float(ma(flow_list, cfg.etf_ma_window).iloc[-1])
-    now = flow_list[-1]
-    p95_90d = rolling_percentile(flow_list, cfg.etf_p_action_90d, window=min(len(flow_list), 24*90)).iloc[-1]
+    flows = np.asarray(flow_usd_series, dtype="float64")
+    ma7 = window_mean(flows, cfg.etf_ma_window)
+    now = float(flows[-1])
+    p95_90d = window_quantile(flows, cfg.etf_p_action_90d, window=min(len(flows), 24*90))
     level = "none"
     if abs(now) >= cfg.etf_mult_action * abs(ma7) or (not math.isnan(p95_90d) and abs(now) >= abs(p95_90d)):
         level = "action"
@@ -220,14 +261,17 @@ def confluence_level(
     layer_levels: {"bias": "watch", "funding": "none", "taker": "action", ...}
     liq_direction_conflict: set True jika ada spike likuidasi yang kontra arah setup.
     """
-    counts = {
-        "action": sum(1 for v in layer_levels.values() if v == "action"),
-        "watch": sum(1 for v in layer_levels.values() if v == "watch"),
-    }
+    # Satu pass atas layer_levels
+    action = watch = 0
+    for v in layer_levels.values():
+        if v == "action":
+            action += 1
+        elif v == "watch":
+            watch += 1
     level = "none"
-    if counts["action"] >= 1 and (counts["action"] + counts["watch"]) >= cfg.action_min:
+    if action >= 1 and (action + watch) >= cfg.action_min:
         level = "action"
-    elif (counts["action"] + counts["watch"]) >= cfg.watch_min:
+    elif (action + watch) >= cfg.watch_min:
         level = "watch"
     if cfg.anti_liq_flip and liq_direction_conflict and level == "action":
         level = "watch"
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 
 class FuturesOIData(BaseModel):
     ts: datetime
@@ -31,6 +31,15 @@ class LiquidationData(BaseModel):
     bucket: Optional[float] = None
     meta: Optional[Dict[str, Any]] = None
 
+class LiquidationInput(BaseModel):
+    """Incoming liquidation record (validation only; extra fields pass through)"""
+    model_config = ConfigDict(extra="allow")
+
+    symbol: str = Field(min_length=2)
+    side: Literal["long", "short"]
+    price: float = Field(gt=0)
+    qty: float = Field(gt=0)
+
 class HeatmapTile(BaseModel):
     ts_min: datetime
     symbol: str
@@ -5,7 +5,6 @@ from app.core.dq import DataQueue
 from app.core.logging import logger
 
 liquidation_queue = DataQueue("liquidations")
-funding_queue = DataQueue("funding")
 
 def start_websocket_feeds():
     """Start WebSocket feeds for real-time data"""
@@ -36,8 +35,5 @@ def on_liquidation_message(data: dict):
 
 def on_funding_message(data: dict):
     """Process incoming funding rate data"""
-    try:
-        funding_queue.push(data)
-        logger.debug(f"Funding data queued: {data}")
-    except Exception as e:
-        logger.error(f"Error processing funding message: {e}")
\ No newline at end of file
+    # Not queued: nothing drains funding yet, so a queue would only grow
+    logger.debug(f"Funding data received: {data}")
\ No newline at end of file
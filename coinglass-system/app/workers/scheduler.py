@@ -4,7 +4,7 @@ import sys
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 from app.workers.fetch_rest import fetch_all_data
-from app.workers.fetch_ws import start_websocket_feeds
+from app.workers.fetch_ws import start_websocket_feeds, liquidation_queue
 from app.workers.build_heatmap import build_heatmaps
 from app.workers.signals import generate_signals
 from app.core.settings import settings
@@ -55,6 +55,13 @@ class EnhancedScheduler:
         )
         
         # Enhanced tasks
+        self.scheduler.add_job(
+            self.drain_liquidation_queue,
+            'interval',
+            seconds=5,
+            id='drain_liquidation_queue'
+        )
+        
         self.scheduler.add_job(
             self.run_risk_assessments,
             'interval',
@@ -100,6 +107,18 @@ class EnhancedScheduler:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
+    def drain_liquidation_queue(self):
+        """Drain queued WebSocket liquidations into the processing pipeline"""
+        try:
+            liquidations = liquidation_queue.drain(count=settings.BATCH_SIZE)
+            if liquidations:
+                asyncio.run(data_processor.process_liquidation_batch(liquidations))
+            else:
+                asyncio.run(data_processor.flush_liquidations_if_due())
+                
+        except Exception as e:
+            self.logger.error(f"Error draining liquidation queue: {e}")
+    
     def run_risk_assessments(self):
         """Run periodic risk assessments"""
         try:
@@ -240,6 +259,12 @@ class EnhancedScheduler:
         if self.scheduler.running:
             self.scheduler.shutdown(wait=True)
         
+        # Commit whatever the liquidation writer still has buffered
+        try:
+            asyncio.run(data_processor.flush_liquidations())
+        except Exception as e:
+            self.logger.error(f"Error flushing liquidation buffer: {e}")
+        
         self.logger.info("Scheduler stopped gracefully")
     
     def _signal_handler(self, signum, frame):
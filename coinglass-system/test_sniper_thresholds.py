@@ -4,7 +4,7 @@ import numpy as np
 import pandas as pd
 import pytest
 from app.core.sniper_thresholds import (
-    rolling_percentile, ma, normalize_funding_to_bps_per_8h, roc, taker_ratio,
+    rolling_percentile, window_quantile, window_quantiles, ma, window_mean, normalize_funding_to_bps_per_8h, roc, taker_ratio,
     LayerConfig, ConfluenceConfig,
     evaluate_bias, evaluate_funding, evaluate_oi_roc, evaluate_taker_ratio,
     evaluate_liquidation_coin_agg, evaluate_etf_flows, confluence_level
@@ -16,6 +16,25 @@ def test_rolling_percentile_basic():
     # last window = [3,4,5] -> median = 4
     assert pytest.approx(p50[-1], rel=1e-6) == 4
 
+@pytest.mark.parametrize("window", [3, 168, 500])
+def test_window_quantile_matches_rolling_tail(window):
+    vals = np.random.default_rng(window).lognormal(10, 2, size=300)
+    for q in (0.85, 0.95, 0.99):
+        expected = rolling_percentile(vals, q, window=window).iloc[-1]
+        assert window_quantile(vals, q, window) == pytest.approx(expected, rel=1e-9)
+
+def test_window_quantiles_single_pass():
+    vals = np.random.default_rng(1).normal(size=400)
+    qs = (0.85, 0.95, 0.99)
+    assert window_quantiles(vals, qs, 168).tolist() == [window_quantile(vals, q, 168) for q in qs]
+    assert np.isnan(window_quantiles([1.0, np.nan, 2.0], qs, 3)).all()
+
+@pytest.mark.parametrize("n", [3, 7, 50])
+def test_window_mean_matches_ma_tail(n):
+    vals = np.random.default_rng(n).normal(size=n)
+    assert window_mean(vals, 7) == pytest.approx(ma(vals, 7).iloc[-1], rel=1e-12)
+    assert math.isnan(window_mean([1.0, np.nan], 7))
+
 def test_funding_normalization():
     # 0.01% per 8h = 1 bps per 8h
     bps8 = normalize_funding_to_bps_per_8h(0.0001, interval_hours=8)
@@ -27,6 +46,20 @@ def test_bias_evaluator():
     cfg = LayerConfig()
     assert evaluate_bias(0.65, hist, cfg) == "action"
 
+def test_bias_evaluator_z_score_matches_pandas():
+    hist = np.random.default_rng(2).normal(0, 0.05, size=300)
+    mu, sd = pd.Series(hist).mean(), pd.Series(hist).std(ddof=1)
+    cfg = LayerConfig(bias_abs_watch=10, bias_abs_action=10)
+    assert evaluate_bias(mu + 1.5 * sd, hist, cfg) == "watch"
+    assert evaluate_bias(mu - 2.5 * sd, hist, cfg) == "action"
+    assert evaluate_bias(mu + 0.5 * sd, hist, cfg) == "none"
+
+@pytest.mark.parametrize("hist", [[], [0.3]])
+def test_bias_evaluator_short_history_uses_unit_std(hist):
+    cfg = LayerConfig(bias_abs_watch=10, bias_abs_action=10)
+    assert evaluate_bias(1.5, hist, cfg) == "watch"
+    assert evaluate_bias(0.5, hist, cfg) == "none"
+
 def test_taker_ratio_evaluator_watch_action():
     cfg = LayerConfig()
     buys = [10, 12, 11, 13, 15, 18]
@@ -37,6 +70,14 @@ def test_taker_ratio_evaluator_watch_action():
     assert meta["now"] == pytest.approx(18/10)
     assert level in {"watch","action"}
 
+def test_taker_ratio_evaluator_matches_scalar_ratio():
+    rng = np.random.default_rng(5)
+    buys, sells = rng.uniform(0, 3e6, size=(2, 200))
+    sells[-1] = 0.0
+    for n_sell in (200, 150):
+        _, meta = evaluate_taker_ratio(buys, sells[:n_sell], LayerConfig())
+        assert meta["now"] == taker_ratio(buys[n_sell - 1], sells[n_sell - 1])
+
 def test_funding_evaluator_abs_and_pct():
     cfg = LayerConfig()
     # series around 3 bps, last spike 12 bps -> action
@@ -46,6 +87,12 @@ def test_funding_evaluator_abs_and_pct():
     assert level == "action"
     assert meta["now_bps8"] > meta["p95"] or meta["now_bps8"] >= cfg.fund_abs_action_bps
 
+@pytest.mark.parametrize("interval_hours", [1, 4, 8])
+def test_funding_evaluator_matches_scalar_normalization(interval_hours):
+    series = np.random.default_rng(interval_hours).normal(0, 0.0005, size=200)
+    _, meta = evaluate_funding(series, interval_hours=interval_hours, cfg=LayerConfig())
+    assert meta["now_bps8"] == normalize_funding_to_bps_per_8h(series[-1], interval_hours)
+
 def test_oi_roc_evaluator():
     cfg = LayerConfig()
     oi = [100, 102, 108]  # +5.88% last bar
@@ -54,6 +101,16 @@ def test_oi_roc_evaluator():
     assert level in {"watch", "action"}
     assert meta["roc"] > 0
 
+@pytest.mark.parametrize("oi, px, expected", [
+    ([100, 103], [20, 21], "watch"), ([100, 106], [20, 21], "action"),
+    ([100, 97], [21, 20], "watch"), ([100, 94], [21, 20], "action"),
+    ([100, 106], [21, 20], "none"), ([100, 94], [20, 20], "none"), ([100, 101], [20, 21], "none"),
+])
+def test_oi_roc_evaluator_direction(oi, px, expected):
+    level, meta = evaluate_oi_roc(oi, px, LayerConfig())
+    assert level == expected
+    assert meta["price_up"] == (px[-1] > px[-2])
+
 def test_liquidation_coin_agg():
     cfg = LayerConfig()
     longs = [1e5]*100 + [5e6]  # spike
@@ -62,6 +119,13 @@ def test_liquidation_coin_agg():
     assert level in {"watch","action"}
     assert meta["now"] >= (meta["p95"] if not math.isnan(meta["p95"]) else 0)
 
+def test_liquidation_coin_agg_truncates_like_zip():
+    longs = np.random.default_rng(8).lognormal(13, 1, size=200)
+    shorts = np.random.default_rng(9).lognormal(13, 1, size=180)
+    _, meta = evaluate_liquidation_coin_agg(longs, shorts, LayerConfig())
+    assert meta["now"] == longs[179] + shorts[179]
+    assert meta["p99"] == window_quantile(longs[:180] + shorts, 0.99, 168)
+
 def test_etf_flows():
     cfg = LayerConfig()
     flows = [1e6]*30 + [5e6]   # ~MA7 ~1e6; 5x spike -> action
@@ -0,0 +1,196 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from app.core.data_processor import DataProcessor, get_bucket_step
+
+class TestEnrichData:
+    def setup_method(self):
+        self.processor = DataProcessor()
+    
+    def test_bucket_uses_fixed_symbol_grid(self):
+        # Nearby prices must land in the same heatmap bucket
+        first = self.processor.enrich_data({"symbol": "BTC", "price": 45003.2, "qty": 1.0}, "liquidation")
+        second = self.processor.enrich_data({"symbol": "BTC", "price": 45008.9, "qty": 1.0}, "liquidation")
+        
+        assert first["bucket"] == 45000.0
+        assert second["bucket"] == 45000.0
+    
+    def test_bucket_fallback_for_unknown_symbol(self):
+        assert get_bucket_step("DOGE", 0.1234) == pytest.approx(0.0001)
+        assert get_bucket_step("XYZ", 2500.0) == pytest.approx(1.0)
+    
+    @pytest.mark.parametrize("usd_value,expected", [
+        (50000, "low"),
+        (100000, "low"),        # Exactly at threshold
+        (100001, "medium"),
+        (1000001, "high"),
+        (10000001, "critical"),
+    ])
+    def test_severity_classification(self, usd_value, expected):
+        enriched = self.processor.enrich_data({"symbol": "BTC", "price": usd_value, "qty": 1}, "liquidation")
+        assert enriched["severity"] == expected
+    
+    def test_batch_enrichment_matches_single_record(self, sample_liquidation_data):
+        records = [sample_liquidation_data, {**sample_liquidation_data, "symbol": "SOL", "price": 101.37, "qty": 10}]
+        batch = self.processor.enrich_liquidation_batch(records)
+        
+        for record, enriched in zip(records, batch):
+            single = self.processor.enrich_data(record, "liquidation")
+            assert enriched["usd_value"] == pytest.approx(single["usd_value"])
+            assert enriched["bucket"] == pytest.approx(single["bucket"])
+            assert enriched["severity"] == single["severity"]
+
+class TestLiquidationInsert:
+    def setup_method(self):
+        self.processor = DataProcessor()
+    
+    @patch('app.core.data_processor.engine')
+    def test_batch_inserted_in_single_execute(self, mock_engine, sample_liquidation_data):
+        mock_conn = MagicMock()
+        mock_engine.begin.return_value.__enter__.return_value = mock_conn
+        
+        asyncio.run(self.processor._insert_liquidation_batch([sample_liquidation_data] * 3))
+        
+        mock_conn.execute.assert_called_once()
+        rows = mock_conn.execute.call_args[0][1]
+        assert len(rows) == 3
+        assert rows[0]["symbol"] == "BTC"
+    
+    @patch('psycopg2.extras.execute_values')
+    @patch('app.core.data_processor.engine')
+    def test_psycopg2_uses_raw_execute_values(self, mock_engine, mock_execute_values, sample_liquidation_data):
+        mock_engine.dialect.driver = "psycopg2"
+        mock_conn = MagicMock()
+        mock_engine.raw_connection.return_value = mock_conn
+        
+        asyncio.run(self.processor._insert_liquidation_batch([sample_liquidation_data] * 2))
+        
+        mock_engine.begin.assert_not_called()
+        rows = mock_execute_values.call_args[0][2]
+        assert len(rows) == 2
+        assert rows[0][1:5] == ("BTC", "long", 45000.0, 1000000.0)
+        mock_conn.commit.assert_called_once()
+        mock_conn.close.assert_called_once()
+    
+    @patch('app.core.data_processor.engine')
+    def test_small_batches_are_group_committed(self, mock_engine, sample_liquidation_data):
+        mock_conn = MagicMock()
+        mock_engine.begin.return_value.__enter__.return_value = mock_conn
+        self.processor.flush_rows = 3
+        self.processor.flush_interval = 3600
+        
+        for price in (45000.0, 45100.0):
+            asyncio.run(self.processor.process_liquidation_batch([{**sample_liquidation_data, "price": price}]))
+        mock_engine.begin.assert_not_called()
+        
+        asyncio.run(self.processor.process_liquidation_batch([{**sample_liquidation_data, "price": 45200.0}]))
+        mock_engine.begin.assert_called_once()
+        assert len(mock_conn.execute.call_args[0][1]) == 3
+        assert self.processor.pending_liquidations == []
+    
+    def test_failed_flush_keeps_rows_buffered(self, sample_liquidation_data):
+        self.processor.pending_liquidations = [{"id": 1}, {"id": 2}]
+        
+        async def flush_while_buffering():
+            async def insert(batch):
+                self.processor.pending_liquidations.append({"id": 3})  # Arrives mid-flush
+                raise RuntimeError("db down")
+            
+            with patch.object(self.processor, '_insert_liquidation_batch', side_effect=insert):
+                await self.processor.flush_liquidations()
+        
+        with pytest.raises(RuntimeError):
+            asyncio.run(flush_while_buffering())
+        
+        assert self.processor.pending_liquidations == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+class TestDeduplication:
+    def setup_method(self):
+        self.processor = DataProcessor()
+    
+    def test_duplicates_dropped_within_and_across_batches(self, sample_liquidation_data):
+        other = {**sample_liquidation_data, "price": 45100.0}
+        
+        assert self.processor.deduplicate_data([sample_liquidation_data, sample_liquidation_data, other]) == [sample_liquidation_data, other]
+        assert self.processor.deduplicate_data([sample_liquidation_data]) == []
+    
+    def test_cleanup_keeps_newest_hashes(self, sample_liquidation_data):
+        records = [{**sample_liquidation_data, "qty": i + 1} for i in range(10001)]
+        self.processor.deduplicate_data(records)
+        
+        assert len(self.processor.processed_hashes) == 5000
+        assert self.processor.generate_data_hash(records[-1]) in self.processor.processed_hashes
+        assert self.processor.generate_data_hash(records[0]) not in self.processor.processed_hashes
+
+class TestValidation:
+    def setup_method(self):
+        self.processor = DataProcessor()
+    
+    def test_valid_liquidation(self, sample_liquidation_data):
+        assert self.processor.validate_liquidation_data(sample_liquidation_data)
+        assert self.processor.validate_liquidation_data({**sample_liquidation_data, "price": "45000.5"})
+    
+    @pytest.mark.parametrize("override", [
+        {"price": 0},
+        {"qty": -1},
+        {"price": "not-a-number"},
+        {"side": "up"},
+        {"symbol": "B"},
+        {"symbol": 123},
+    ])
+    def test_invalid_liquidation(self, sample_liquidation_data, override):
+        assert not self.processor.validate_liquidation_data({**sample_liquidation_data, **override})
+    
+    def test_missing_field(self, sample_liquidation_data):
+        del sample_liquidation_data["qty"]
+        assert not self.processor.validate_liquidation_data(sample_liquidation_data)
+
+class TestPrepareLiquidationBatch:
+    def setup_method(self):
+        self.processor = DataProcessor()
+    
+    def test_fused_pass_validates_dedups_and_enriches(self, sample_liquidation_data):
+        no_timestamp = {k: v for k, v in sample_liquidation_data.items() if k != "timestamp"}
+        batch = [
+            sample_liquidation_data,
+            sample_liquidation_data,                     # In-batch duplicate
+            {**sample_liquidation_data, "side": "up"},   # Invalid
+            {**no_timestamp, "symbol": "SOL", "price": "101.37", "qty": 10},
+        ]
+        
+        result = self.processor.prepare_liquidation_batch(batch)
+        
+        assert [record["symbol"] for record in result] == ["BTC", "SOL"]
+        assert result[0]["severity"] == "critical"
+        assert result[1]["timestamp"] is None
+        assert result[1]["price"] == pytest.approx(101.37)
+        assert result[1]["bucket"] == pytest.approx(101.3)
+        
+        # Already processed rows are dropped on the next batch
+        assert self.processor.prepare_liquidation_batch([sample_liquidation_data]) == []
+    
+    def test_shares_hashes_with_deduplicate_data(self, sample_liquidation_data):
+        other = {**sample_liquidation_data, "price": 45100.0}
+        self.processor.deduplicate_data([other])
+        
+        result = self.processor.prepare_liquidation_batch([sample_liquidation_data, other])
+        
+        assert [record["price"] for record in result] == [45000.0]
+    
+    def test_row_without_timestamp_dedups_across_batch_schemas(self, sample_liquidation_data):
+        no_timestamp = {k: v for k, v in sample_liquidation_data.items() if k != "timestamp"}
+        assert len(self.processor.prepare_liquidation_batch([no_timestamp])) == 1
+        
+        result = self.processor.prepare_liquidation_batch([sample_liquidation_data, no_timestamp])
+        
+        assert [record["timestamp"] for record in result] == ["2023-01-01T00:00:00Z"]
+    
+    def test_non_string_symbol_rejects_only_that_row(self, sample_liquidation_data):
+        batch = [{**sample_liquidation_data, "symbol": 42}, {**sample_liquidation_data, "symbol": "ETH"}]
+        
+        assert [record["symbol"] for record in self.processor.prepare_liquidation_batch(batch)] == ["ETH"]
+        assert self.processor.prepare_liquidation_batch([{**sample_liquidation_data, "symbol": 7}]) == []
+    
+    def test_missing_required_column(self, sample_liquidation_data):
+        del sample_liquidation_data["side"]
+        assert self.processor.prepare_liquidation_batch([sample_liquidation_data]) == []
@@ -0,0 +1,46 @@
+import threading
+import time
+import pytest
+from app.core import cache
+from app.core.dq import DataQueue
+
+class TestDataQueue:
+    def setup_method(self):
+        self.original_db = cache.db
+        cache.db = {}  # stands in for ReplDB's key/value interface
+        self.queue = DataQueue("liquidations")
+    
+    def teardown_method(self):
+        cache.db = self.original_db
+    
+    def test_pop_batch_is_fifo(self):
+        self.queue.push({"id": 1})
+        self.queue.push_many([{"id": 2}, {"id": 3}, {"id": 4}])
+        
+        assert [item["id"] for item in self.queue.pop_batch(3)] == [1, 2, 3]
+        assert self.queue.size() == 1
+        assert self.queue.pop() == {"id": 4}
+        assert "liquidations" not in cache.db
+    
+    def test_push_past_max_length_drops_oldest(self):
+        queue = DataQueue("capped", max_length=3)
+        queue.push_many([{"id": i} for i in range(5)])
+        queue.push({"id": 5})
+        
+        assert [item["id"] for item in queue.pop_batch(10)] == [3, 4, 5]
+    
+    def test_pop_returns_none_on_timeout(self):
+        start = time.monotonic()
+        assert self.queue.pop_batch(10, timeout=0.05) == []
+        assert time.monotonic() - start >= 0.05
+    
+    def test_waiting_consumer_wakes_on_push(self):
+        threading.Timer(0.05, self.queue.push, args=({"id": 1},)).start()
+        
+        assert self.queue.drain(count=500, timeout=5) == [{"id": 1}]
+    
+    def test_store_failure_raises(self):
+        cache.db = None
+        
+        with pytest.raises(RuntimeError):
+            self.queue.push({"id": 1})
@@ -0,0 +1,209 @@
+import asyncio
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from app.core.enhanced_sniper_engine import (
+    EnhancedSniperEngine, Level, P2Quantile, RingBuffer, RollingPercentileEngine, RollingWindow,
+    build_layer_cfgs, classify_level
+)
+
+class TestRingBuffer:
+    def test_add_overwrites_oldest_once_full(self):
+        ring = RingBuffer(3)
+        assert [ring.add(v) for v in (1.0, 2.0, 3.0)] == [None, None, None]
+        assert ring.add(4.0) == 1.0
+        assert ring.add(5.0) == 2.0
+        assert len(ring) == 3
+        assert sorted(ring.view().tolist()) == [3.0, 4.0, 5.0]
+
+class TestRollingWindow:
+    def test_stats_stay_exact_on_large_usd_values(self):
+        rng = np.random.default_rng(9)
+        values = 5e9 + rng.normal(0, 1e6, size=5000)
+        window = RollingWindow(168)
+        for value in values:
+            window.add(float(value))
+        
+        assert window.mean() == pytest.approx(values[-168:].mean(), rel=1e-12)
+        assert window.std() == pytest.approx(values[-168:].std(), rel=1e-6)
+
+class TestP2Quantile:
+    @pytest.mark.parametrize("percentile", [85, 95, 99])
+    def test_estimate_tracks_numpy_percentile(self, percentile):
+        rng = np.random.default_rng(percentile)
+        values = rng.normal(100, 15, size=20000)
+        estimator = P2Quantile(percentile / 100)
+        for value in values:
+            estimator.add(float(value))
+        
+        assert estimator.value() == pytest.approx(np.percentile(values, percentile), rel=0.01)
+    
+    def test_engine_uses_p2_when_configured(self):
+        config = dict(RollingPercentileEngine().config, percentile_estimator="p2")
+        engine = RollingPercentileEngine(config)
+        rng = np.random.default_rng(2)
+        values = rng.normal(50, 5, size=2000)
+        for value in values:
+            engine.add_data_point("funding", "BTC", float(value))  # 30d window = 720 points
+        
+        assert engine.historical_data["funding_BTC"].sorted_values == []
+        assert engine.calculate_percentile("funding", "BTC", 95) == pytest.approx(np.percentile(values[-720:], 95), rel=0.02)
+        assert engine.calculate_percentile("funding", "BTC", 50) is None
+
+class TestLayerCfg:
+    def test_build_layer_cfgs_converts_thresholds(self):
+        cfgs = build_layer_cfgs({
+            "taker_ratio": {"lookback": "30d", "p_watch": 85, "p_action": 95,
+                            "abs_watch": [1.40, 0.70], "abs_action": [1.80, 0.55]},
+            "funding": {"lookback": "90d", "abs_per_8h_watch_bps": 5, "abs_per_8h_action_bps": 10},
+            "etf_flows": {"mult_watch": 1.5, "mult_action": 3, "p_action_90d": 95},
+        })
+        
+        assert cfgs["taker_ratio"].abs_action == (1.80, 0.55)
+        assert cfgs["funding"].window_size == 2160
+        assert cfgs["funding"].abs_watch == (5.0,)
+        assert cfgs["etf_flows"].window_size == 720
+        assert cfgs["etf_flows"].mult_action == 3.0
+
+class TestClassifyLevel:
+    @pytest.mark.parametrize("value, expected", [
+        (1.9, 2), (0.5, 2), (1.5, 1), (0.6, 1), (1.0, 0),
+    ])
+    def test_mirrored_bands(self, value, expected):
+        assert classify_level(value, 1.4, 1.8, 0.7, 0.55) == expected
+    
+    def test_missing_thresholds_skip_rungs(self):
+        assert classify_level(10.0, None, None) == 0
+        assert classify_level(10.0, 5.0, None) == 1
+
+class TestRollingPercentileEngine:
+    def setup_method(self):
+        self.engine = RollingPercentileEngine()
+    
+    def test_percentile_requires_minimum_history(self):
+        for value in range(19):
+            self.engine.add_data_point("funding", "BTC", float(value))
+        
+        assert self.engine.calculate_percentile("funding", "BTC", 95) is None
+    
+    @pytest.mark.parametrize("percentile", [85, 95, 99])
+    def test_percentile_matches_numpy_over_rolling_window(self, percentile):
+        rng = np.random.default_rng(7)
+        values = rng.lognormal(mean=10, sigma=2, size=300)
+        for value in values:
+            self.engine.add_data_point("liquidation", "BTC", float(value))  # 7d window = 168 points
+        
+        expected = np.percentile(values[-168:], percentile)
+        assert self.engine.calculate_percentile("liquidation", "BTC", percentile) == pytest.approx(expected)
+    
+    def test_cached_percentiles_stay_exact_as_window_rolls(self):
+        rng = np.random.default_rng(21)
+        values = rng.normal(0, 1, size=500)
+        for i, value in enumerate(values):
+            self.engine.add_data_point("liquidation", "ETH", float(value))  # 7d window = 168 points
+            if i < 19:
+                continue
+            window = values[max(0, i - 167):i + 1]
+            for percentile in (95, 99):
+                expected = np.percentile(window, percentile)
+                assert self.engine.calculate_percentile("liquidation", "ETH", percentile) == pytest.approx(expected)
+    
+    def test_z_score_matches_numpy_over_rolling_window(self):
+        rng = np.random.default_rng(3)
+        values = rng.normal(5.0, 2.0, size=900)
+        for value in values:
+            self.engine.add_data_point("funding", "ETH", float(value))  # 30d window = 720 points
+        
+        window = values[-720:]
+        expected = abs(9.0 - window.mean()) / window.std()
+        assert self.engine.calculate_z_score("funding", "ETH", 9.0) == pytest.approx(expected)
+        assert self.engine.z_score_squared("funding", "ETH", 9.0) == pytest.approx(expected ** 2)
+    
+    def test_etf_moving_average_is_running_sum(self):
+        flows = [float(v) for v in range(1, 11)]
+        for i, flow in enumerate(flows):
+            self.engine.add_data_point("etf_flows", "BTC", flow)
+            if i < 6:
+                assert self.engine.etf_moving_average("BTC") is None
+            else:
+                assert self.engine.etf_moving_average("BTC") == pytest.approx(np.mean(flows[i - 6:i + 1]))
+
+def make_mock_client(seed):
+    """Mock CoinglassClient returning random layer responses
+    
+    Each endpoint draws from its own generator so responses don't depend on
+    the order the batch path's worker threads happen to call them in.
+    """
+    taker_rng, funding_rng, liq_rng, etf_rng = (np.random.default_rng([seed, i]) for i in range(4))
+    client = Mock()
+    client.taker_buysell_volume_aggregated.side_effect = lambda *a, **k: {"data": [{
+        "aggregated_buy_volume_usd": taker_rng.uniform(1e6, 3e6),
+        "aggregated_sell_volume_usd": taker_rng.uniform(1e6, 3e6)}]}
+    client.funding_rate.side_effect = lambda *a, **k: {"data": [{"close": funding_rng.normal(0, 0.0005)}]}
+    client.liquidation_coin_history.side_effect = lambda *a, **k: {"data": [{
+        "aggregated_long_liquidation_usd": liq_rng.lognormal(13, 1),
+        "aggregated_short_liquidation_usd": liq_rng.lognormal(13, 1)}]}
+    client.etf_bitcoin_flows.side_effect = lambda *a, **k: {"data": [{"flow_usd": etf_rng.normal(0, 1e8)}]}
+    return client
+
+class TestEnhancedSniperEngine:
+    def test_batch_levels_match_scalar_layers(self):
+        scalar_engine = EnhancedSniperEngine()
+        batch_engine = EnhancedSniperEngine()
+        scalar_engine.client = make_mock_client(11)
+        batch_engine.client = make_mock_client(11)
+        
+        async def run_scalar():
+            signals = [
+                await scalar_engine.analyze_taker_ratio("BTC"),
+                await scalar_engine.analyze_funding_rate("BTC"),
+                await scalar_engine.analyze_liquidation("BTC"),
+                await scalar_engine.analyze_etf_flows("BTC"),
+            ]
+            return [int(signal.level) for signal in signals]
+        
+        for _ in range(60):
+            expected = asyncio.run(run_scalar())
+            levels = asyncio.run(batch_engine.analyze_all_layers_batch(["BTC"]))
+            assert levels.shape == (1, 4)
+            assert levels[0].tolist() == expected
+    
+    def test_confluence_batch_matches_scalar_confluence(self):
+        scalar_engine = EnhancedSniperEngine()
+        batch_engine = EnhancedSniperEngine()
+        scalar_engine.client = make_mock_client(5)
+        batch_engine.client = make_mock_client(5)
+        
+        for _ in range(40):
+            expected = asyncio.run(scalar_engine.run_confluence_analysis("BTC"))
+            result = asyncio.run(batch_engine.run_confluence_batch(["BTC"]))["BTC"]
+            
+            assert result.overall_level == expected.overall_level
+            assert result.confluence_score == pytest.approx(expected.confluence_score)
+            assert result.kill_switch_active == expected.kill_switch_active
+            assert [(s.name, s.level) for s in result.layers_triggered] == \
+                   [(s.name, s.level) for s in expected.layers_triggered]
+            for got, want in zip(result.layers_triggered, expected.layers_triggered):
+                assert got.value == pytest.approx(want.value)
+                assert got.threshold_used == pytest.approx(want.threshold_used)
+    
+    def test_get_enhanced_sniper_engine_is_singleton(self):
+        from app.core import enhanced_sniper_engine
+        
+        enhanced_sniper_engine.sniper_engine = None
+        assert enhanced_sniper_engine.get_enhanced_sniper_engine() is enhanced_sniper_engine.get_enhanced_sniper_engine()
+        enhanced_sniper_engine.sniper_engine = None
+    
+    def test_active_kill_switch_skips_layer_fetches(self):
+        engine = EnhancedSniperEngine()
+        engine.client = make_mock_client(1)
+        engine.kill_switch_until = datetime.now() + timedelta(minutes=5)
+        
+        result = asyncio.run(engine.run_confluence_analysis("BTC"))
+        batch = asyncio.run(engine.run_confluence_batch(["BTC", "ETH"]))
+        
+        assert result.overall_level == Level.NONE and result.kill_switch_active
+        assert all(r.overall_level == Level.NONE and r.kill_switch_active for r in batch.values())
+        engine.client.taker_buysell_volume_aggregated.assert_not_called()
+        engine.client.etf_bitcoin_flows.assert_not_called()
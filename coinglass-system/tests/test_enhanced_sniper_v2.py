@@ -0,0 +1,162 @@
+import asyncio
+from datetime import datetime, timedelta
+from collections import deque
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, Mock
+from app.core import mcache
+from app.core.enhanced_sniper_v2 import DataBuffer, EnhancedSniperEngineV2, LayerSignal, SortedWindow, _extract_columns
+from app.core.sniper_thresholds import window_quantiles
+
+class TestDataBuffer:
+    def test_matches_bounded_deque(self):
+        rng = np.random.default_rng(4)
+        buffer = DataBuffer(max_size=50)
+        reference = deque(maxlen=50)
+        
+        for _ in range(200):
+            if rng.random() < 0.5:
+                value = float(rng.normal())
+                buffer.add_data("k", value)
+                reference.append(value)
+            else:
+                values = rng.normal(size=int(rng.integers(0, 80)))
+                buffer.extend("k", values)
+                reference.extend(values.tolist())
+            
+            assert buffer.get_array("k").tolist() == list(reference)
+            lookback = int(rng.integers(1, 60))
+            assert buffer.get_data("k", lookback=lookback) == list(reference)[-lookback:]
+    
+    def test_unknown_key_is_empty(self):
+        buffer = DataBuffer()
+        
+        assert buffer.get_array("missing").size == 0
+        assert not buffer.has_sufficient_data("missing", 1)
+
+class TestSortedWindow:
+    def test_incremental_quantiles_match_numpy(self):
+        rng = np.random.default_rng(8)
+        qs = (0.85, 0.95, 0.99)
+        buffer = DataBuffer(max_size=500)
+        buffer.extend("k", rng.lognormal(10, 2, size=300))
+        state = buffer.track_quantiles("k", 168)  # bootstrapped from the buffered tail
+        
+        for _ in range(100):
+            if rng.random() < 0.7:
+                buffer.add_data("k", float(rng.lognormal(10, 2)))
+            else:
+                buffer.extend("k", rng.lognormal(10, 2, size=int(rng.integers(0, 250))))
+            
+            assert state.quantiles(qs) == pytest.approx(window_quantiles(buffer.get_array("k"), qs, 168).tolist())
+    
+    def test_nan_in_window_gives_nan(self):
+        state = SortedWindow(3, [1.0, float("nan"), 2.0])
+        assert np.isnan(state.quantiles((0.5,))).all()
+        
+        state.extend([3.0, 4.0])
+        assert state.quantiles((0.5,)) == [3.0]
+
+class TestExtractColumns:
+    def test_missing_and_invalid_values_use_defaults(self):
+        rows = [
+            {"buy": "10.5", "sell": 2},
+            {"buy": None},
+            {"buy": "oops", "sell": 4.0},
+        ]
+        
+        buys, sells, other = _extract_columns(rows, {"buy": 0.0, "sell": 1.0, "other": 7.0})
+        
+        assert buys.tolist() == [10.5, 0.0, 0.0]
+        assert sells.tolist() == [2.0, 1.0, 4.0]
+        assert other.tolist() == [7.0, 7.0, 7.0]
+
+def make_mock_client(seed):
+    """Mock CoinglassClient returning random history responses
+    
+    Each endpoint draws from its own generator since the engine calls them
+    from worker threads.
+    """
+    funding_rng, taker_rng, liq_rng, etf_rng = (np.random.default_rng([seed, i]) for i in range(4))
+    client = Mock()
+    client.funding_rate.side_effect = lambda *a, **k: {"data": [
+        {"close": v} for v in funding_rng.normal(0, 0.0005, 100)]}
+    client.taker_buysell_volume_aggregated.side_effect = lambda *a, **k: {"data": [
+        {"aggregated_buy_volume_usd": b, "aggregated_sell_volume_usd": s}
+        for b, s in taker_rng.uniform(1e6, 3e6, (100, 2))]}
+    client.liquidation_coin_history.side_effect = lambda *a, **k: {"data": [
+        {"aggregated_long_liquidation_usd": l, "aggregated_short_liquidation_usd": s}
+        for l, s in liq_rng.lognormal(13, 1, (168, 2))]}
+    client.etf_bitcoin_flows.side_effect = lambda *a, **k: {"data": [
+        {"flow_usd": v} for v in etf_rng.normal(0, 1e8, 200)]}
+    return client
+
+class TestEnhancedSniperEngineV2:
+    def setup_method(self):
+        mcache._cache.clear()
+    
+    def test_confluence_analysis_runs_all_layers(self):
+        engine = EnhancedSniperEngineV2()
+        engine.client = make_mock_client(3)
+        
+        for _ in range(3):
+            engine.kill_switch_until = None  # random liquidations may trip it
+            result = asyncio.run(engine.run_confluence_analysis("BTC"))
+        
+        assert "error" not in result.metadata
+        assert set(result.metadata["layer_levels"]) == {"bias", "funding", "taker_ratio", "liquidation", "etf_flows"}
+        assert engine.data_buffer.has_sufficient_data("funding_BTC", 100)
+    
+    def test_each_response_is_buffered_once(self):
+        engine = EnhancedSniperEngineV2()
+        engine.client = make_mock_client(6)
+        
+        asyncio.run(engine.run_confluence_analysis("BTC"))
+        
+        for key, rows in (("funding_BTC", 100), ("taker_buy_BTC", 100), ("liq_long_BTC", 168), ("etf_flows_BTC", 200)):
+            assert engine.data_buffer.count[key] == rows
+    
+    def test_etf_p95_is_exact_over_90d_window(self):
+        engine = EnhancedSniperEngineV2()
+        engine.client = make_mock_client(7)
+        
+        for _ in range(12):  # buffer grows past the 2160-point window
+            mcache._cache.clear()
+            signal = asyncio.run(engine.analyze_etf_flows("BTC"))
+        
+        flows = engine.data_buffer.get_array("etf_flows_BTC")
+        assert signal.metadata["p95_90d"] == pytest.approx(np.quantile(flows[-2160:], engine.layer_config.etf_p_action_90d))
+    
+    def test_etf_flows_fetched_once_per_scan(self):
+        engine = EnhancedSniperEngineV2()
+        engine.client = make_mock_client(2)
+        
+        async def scan():
+            return await asyncio.gather(*(engine.run_confluence_analysis(s) for s in ("BTC", "ETH", "SOL")))
+        
+        results = asyncio.run(scan())
+        
+        assert engine.client.etf_bitcoin_flows.call_count == 1
+        assert engine.client.funding_rate.call_count == 3
+        assert len({r.metadata["layer_levels"]["etf_flows"] for r in results}) == 1
+    
+    def test_get_enhanced_sniper_engine_v2_is_singleton(self):
+        from app.core import enhanced_sniper_v2
+        
+        enhanced_sniper_v2.sniper_engine_v2 = None
+        assert enhanced_sniper_v2.get_enhanced_sniper_engine_v2() is enhanced_sniper_v2.get_enhanced_sniper_engine_v2()
+        enhanced_sniper_v2.sniper_engine_v2 = None
+    
+    def test_active_kill_switch_downgrades_action_to_watch(self):
+        engine = EnhancedSniperEngineV2()
+        for name, method in (("bias", "analyze_institutional_bias"), ("funding", "analyze_funding_rate"),
+                             ("taker_ratio", "analyze_taker_ratio"), ("liquidation", "analyze_liquidation"),
+                             ("etf_flows", "analyze_etf_flows")):
+            setattr(engine, method, AsyncMock(return_value=LayerSignal(name, "action", 1.0, 0.5)))
+        engine.kill_switch_until = datetime.now() + timedelta(minutes=5)
+        
+        result = asyncio.run(engine.run_confluence_analysis("BTC"))
+        
+        assert result.overall_level == "watch" and result.kill_switch_active
+        assert result.metadata["action_count"] == 5  # layers still run and keep their buffers filling
+        engine.analyze_funding_rate.assert_awaited_once()
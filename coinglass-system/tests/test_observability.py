@@ -0,0 +1,108 @@
+import asyncio
+import io
+import logging
+import threading
+from datetime import datetime, timedelta
+import orjson
+from app.core.observability import BufferedStreamHandler, BusinessMetricsCollector, JSONFormatter, PerformanceMonitor, StructuredLogger
+
+def make_record(msg):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, None, None)
+
+class TestBufferedStreamHandler:
+    def setup_method(self):
+        self.stream = io.StringIO()
+    
+    def test_records_wait_for_flush(self):
+        handler = BufferedStreamHandler(self.stream, flush_interval_ms=60_000)
+        handler.handle(make_record("a"))
+        handler.handle(make_record("b"))
+        
+        assert self.stream.getvalue() == ""
+        handler.flush()
+        assert self.stream.getvalue() == "a\nb\n"
+    
+    def test_full_buffer_is_written_in_one_batch(self):
+        handler = BufferedStreamHandler(self.stream, buf_size=10, flush_interval_ms=60_000)
+        for msg in ("1234", "5678", "90ab"):
+            handler.handle(make_record(msg))
+        
+        assert self.stream.getvalue() == "1234\n5678\n"
+        handler.flush()
+        assert self.stream.getvalue() == "1234\n5678\n90ab\n"
+
+class TestJSONFormatter:
+    def test_timestamp_matches_utcfromtimestamp(self):
+        formatter = JSONFormatter()
+        for created in (1_700_000_000.25, 1_700_000_000.999999, 1_700_000_001.0, 1_699_999_999.5):
+            record = make_record("x")
+            record.created = created
+            
+            timestamp = datetime.fromisoformat(orjson.loads(formatter.format(record))["timestamp"])
+            assert abs(timestamp - datetime.utcfromtimestamp(created)) <= timedelta(microseconds=1)
+
+class TestPerformanceMonitor:
+    def test_metrics_derive_average_on_read(self):
+        monitor = PerformanceMonitor()
+        
+        @monitor.time_operation("op")
+        def op(fail=False):
+            if fail:
+                raise ValueError
+        
+        op()
+        op()
+        try:
+            op(fail=True)
+        except ValueError:
+            pass
+        
+        metric = monitor.get_metrics()["op"]
+        assert metric["count"] == 3
+        assert (metric["success_count"], metric["error_count"]) == (2, 1)
+        assert metric["avg_duration"] == metric["total_duration"] / 3
+        assert metric["min_duration"] <= metric["max_duration"]
+    
+    def test_coroutines_get_an_async_wrapper(self):
+        monitor = PerformanceMonitor()
+        
+        @monitor.time_operation("fetch")
+        async def fetch():
+            return 42
+        
+        assert asyncio.iscoroutinefunction(fetch)
+        assert asyncio.run(fetch()) == 42
+        assert monitor.get_metrics()["fetch"]["success_count"] == 1
+    
+    def test_concurrent_recording_keeps_every_sample(self):
+        monitor = PerformanceMonitor()
+        
+        def record():
+            for i in range(2000):
+                monitor._record_metric("op", i * 1e-6, "success")
+        
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        metric = monitor.get_metrics()["op"]
+        assert metric["count"] == metric["success_count"] == 8000
+        assert metric["min_duration"] <= metric["p50_duration"] <= metric["p95_duration"] <= metric["p99_duration"] <= metric["max_duration"]
+
+class TestBusinessMetricsCollector:
+    def test_events_match_structured_logger_output(self):
+        collector = BusinessMetricsCollector()
+        reference = StructuredLogger("business_metrics")
+        captured = []
+        collector._write = captured.append
+        reference._write = lambda level, msg: captured.append(msg)
+        
+        collector.record_data_processed("liquidations", 10, 0.5)
+        reference.info("Data processed", event_type="data_processed", data_type="liquidations",
+                       count=10, processing_time=0.5, records_per_second=20.0)
+        
+        fast, slow = (orjson.loads(msg) for msg in captured)
+        assert fast.pop("timestamp") and slow.pop("timestamp")
+        assert fast == slow
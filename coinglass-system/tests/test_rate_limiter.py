@@ -0,0 +1,23 @@
+from app.core import cache
+from app.core.rate_limiter import RateLimiter
+
+class TestRateLimiter:
+    def setup_method(self):
+        self.store = {}
+        self.original_db = cache.db
+        cache.db = self.store
+    
+    def teardown_method(self):
+        cache.db = self.original_db
+    
+    def test_limit_applies_per_key(self):
+        limiter = RateLimiter(max_requests=3, window_seconds=60)
+        
+        assert [limiter.is_allowed("a") for _ in range(5)] == [True, True, True, False, False]
+        assert limiter.is_allowed("b")
+    
+    def test_store_errors_fail_open(self):
+        cache.db = None
+        limiter = RateLimiter(max_requests=1, window_seconds=60)
+        
+        assert limiter.is_allowed("a") and limiter.is_allowed("a")
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+from app.core.rest_verification import LiquidationEvent, RestVerificationEngine
+
+def make_event(**overrides):
+    data = {"baseAsset": "BTC", "exName": "Binance", "symbol": "BTCUSDT", "price": 60000,
+            "side": 1, "volUsd": 250000, "time": 1_700_000_000_000}
+    data.update(overrides)
+    return LiquidationEvent.from_ws_data(data)
+
+def make_mock_client(delay=0.0):
+    """Mock CoinglassClient whose endpoints block for `delay` seconds"""
+    def respond(payload):
+        def call(*args, **kwargs):
+            time.sleep(delay)
+            return payload
+        return call
+    
+    client = Mock()
+    client.taker_buysell_volume_aggregated.side_effect = respond({"data": [{"buy": 1, "sell": 1}]})
+    client.oi_ohlc.side_effect = respond({"data": [{"o": 100}, {"o": 110}]})
+    client.funding_rate.side_effect = respond({"data": [{"close": 0.0001}]})
+    client.liquidation_history_coin.side_effect = respond({"data": [{"vol": 50000}] * 6})
+    return client
+
+class TestRestVerificationEngine:
+    def setup_method(self):
+        self.engine = RestVerificationEngine()
+    
+    def test_endpoints_are_fetched_concurrently(self):
+        self.engine.coinglass_client = make_mock_client(delay=0.2)
+        
+        start = time.perf_counter()
+        data = asyncio.run(self.engine._fetch_verification_data(make_event()))
+        
+        assert time.perf_counter() - start < 0.6
+        assert set(data) == {"taker", "open_interest", "funding", "liquidation"}
+        assert all(data.values())
+    
+    def test_failed_endpoint_leaves_empty_entry(self):
+        self.engine.coinglass_client = make_mock_client()
+        self.engine.coinglass_client.oi_ohlc.side_effect = RuntimeError("boom")
+        
+        data = asyncio.run(self.engine._fetch_verification_data(make_event()))
+        
+        assert data["open_interest"] == {}
+        assert data["funding"] == {"data": [{"close": 0.0001}]}
+    
+    def test_client_calls_run_off_the_event_loop(self):
+        self.engine.coinglass_client = make_mock_client()
+        threads = set()
+        self.engine.coinglass_client.funding_rate.side_effect = lambda *a, **k: threads.add(threading.get_ident()) or {}
+        
+        asyncio.run(self.engine._fetch_verification_data(make_event()))
+        
+        assert threads and threading.get_ident() not in threads
+    
+    def test_verification_is_cached_per_minute_bucket(self):
+        self.engine.coinglass_client = make_mock_client()
+        
+        first = asyncio.run(self.engine.verify_liquidation_event(make_event()))
+        second = asyncio.run(self.engine.verify_liquidation_event(make_event(time=1_700_000_030_000)))
+        
+        assert second is first
+        assert self.engine.coinglass_client.oi_ohlc.call_count == 1
+    
+    def test_verification_cache_is_bounded(self):
+        assert self.engine.verification_cache.maxsize == 10_000
+        assert self.engine.verification_cache.ttl == self.engine.cache_duration
+    
+    def test_normalize_coin_symbol(self):
+        assert [self.engine._normalize_coin_symbol(s) for s in ("1000bonk", "wbtc", "Eth", "1000")] == \
+               ["BONK", "BTC", "ETH", ""]
+
+class TestLiquidationEvent:
+    def test_missing_fields_use_defaults(self):
+        event = LiquidationEvent.from_ws_data({"baseAsset": "ETH", "volUsd": "1500.5"})
+        
+        assert (event.base_asset, event.exchange, event.side, event.vol_usd, event.timestamp) == ("ETH", "", 1, 1500.5, 0)
+    
+    def test_events_are_slotted(self):
+        assert not hasattr(make_event(), "__dict__")
+
+class TestConfidenceScore:
+    def setup_method(self):
+        self.engine = RestVerificationEngine()
+    
+    def test_full_data_scores_every_factor(self):
+        data = {
+            "taker": {"data": [1]}, "funding": {"data": [1]},
+            "open_interest": {"data": [{"o": 100}, {"o": 110}]},
+            "liquidation": {"data": [{"vol": 50000}] * 5},
+        }
+        
+        assert self.engine._calculate_confidence_score(make_event(volUsd=150000), data) == 25 + 25 + 25 + 25
+    
+    def test_missing_data_uses_defaults(self):
+        data = {"taker": {}, "open_interest": None, "funding": {}, "liquidation": {"data": None}}
+        
+        assert self.engine._calculate_confidence_score(make_event(exName="Other"), data) == 6.25 + 0 + 15 + 15  # only the liquidation entry counts as available
@@ -0,0 +1,53 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from app.core import security
+from app.core.security import SecurityHeaders, setup_security_middleware
+
+class TestSecurityMiddleware:
+    def session_options(self, app):
+        return next(m.kwargs for m in app.user_middleware if m.cls is security.SessionMiddleware)
+    
+    def test_session_secret_comes_from_settings(self, monkeypatch):
+        monkeypatch.setattr(security, "settings", security.settings.model_copy(update={"SESSION_SECRET": "shared-secret"}))
+        app = FastAPI()
+        setup_security_middleware(app)
+        
+        assert self.session_options(app)["secret_key"] == "shared-secret"
+    
+    def test_prod_requires_session_secret(self, monkeypatch):
+        monkeypatch.setattr(security, "settings", security.settings.model_copy(update={"ENV": "prod", "SESSION_SECRET": ""}))
+        
+        with pytest.raises(ValueError):
+            setup_security_middleware(FastAPI())
+
+class TestSecurityHeaders:
+    def test_headers_added_and_app_headers_kept(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"set-cookie", b"a=1"), (b"set-cookie", b"b=2"), (b"x-frame-options", b"SAMEORIGIN")]})
+        
+        sent = []
+        async def send(message):
+            sent.append(message)
+        
+        asyncio.run(SecurityHeaders(app)({"type": "http"}, None, send))
+        
+        headers = sent[0]["headers"]
+        assert headers[:2] == [(b"set-cookie", b"a=1"), (b"set-cookie", b"b=2")]
+        assert [v for k, v in headers if k == b"x-frame-options"] == [b"DENY"]
+        assert len(headers) == 2 + len(SecurityHeaders._SECURITY_HEADERS)
+    
+    def test_header_list_extended_in_place(self):
+        app_headers = [(b"content-type", b"text/plain")]
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": app_headers})
+        
+        sent = []
+        async def send(message):
+            sent.append(message)
+        
+        asyncio.run(SecurityHeaders(app)({"type": "http"}, None, send))
+        
+        assert sent[0]["headers"] is app_headers
+        assert app_headers[1:] == SecurityHeaders._SECURITY_HEADERS
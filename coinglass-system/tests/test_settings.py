@@ -0,0 +1,22 @@
+import pytest
+from pydantic import ValidationError
+from unittest.mock import patch
+from app.core.settings import Settings, get_settings, settings
+
+class TestSettings:
+    def test_get_settings_is_cached_and_frozen(self):
+        assert get_settings() is settings
+        with pytest.raises(ValidationError):
+            settings.ENV = "prod"
+    
+    def test_env_secret_skips_token_generation(self, monkeypatch):
+        monkeypatch.setenv("JWT_SECRET_KEY", "from-env")
+        with patch("secrets.token_urlsafe") as token_urlsafe:
+            assert Settings().JWT_SECRET_KEY == "from-env"
+        token_urlsafe.assert_not_called()
+    
+    def test_db_url_default_read_at_instantiation(self, monkeypatch):
+        monkeypatch.delenv("DB_URL", raising=False)
+        monkeypatch.setenv("DATABASE_URL", "postgresql://late/binding")
+        
+        assert Settings(_env_file=None).DB_URL == "postgresql://late/binding"
@@ -0,0 +1,89 @@
+import threading
+from unittest.mock import Mock
+from app.core.sniper_engine import SniperTimingEngine
+
+def make_mock_client():
+    """Mock CoinglassClient with a bid-heavy, buyer-dominated market"""
+    client = Mock()
+    client.taker_buysell_volume.return_value = {"data": [{"taker_buy_volume_usd": 70, "taker_sell_volume_usd": 30}]}
+    client.funding_rate.return_value = {"data": [{"funding_rate": 0.0001}]}
+    client.futures_orderbook_askbids_history.return_value = {"data": [{"bids_usd": 60, "asks_usd": 40}]}
+    return client
+
+class TestSniperTimingEngine:
+    def setup_method(self):
+        self.engine = SniperTimingEngine()
+        self.engine.client = make_mock_client()
+    
+    def test_analysis_scores_long_setup(self):
+        result = self.engine.analyze_sniper_signals("BTC")
+        
+        assert result["signal"] == "LONG"
+        assert result["metrics"]["long_score"] == 9
+    
+    def test_responses_are_cached_per_endpoint_ttl(self):
+        self.engine.analyze_sniper_signals("BTC")
+        self.engine.analyze_sniper_signals("BTC")
+        self.engine.analyze_sniper_signals("ETH")
+        
+        assert self.engine.client.taker_buysell_volume.call_count == 2
+        assert self.engine.client.futures_orderbook_askbids_history.call_count == 2
+        
+        self.engine._orderbook_cache.clear()  # orderbook expires first
+        self.engine.analyze_sniper_signals("BTC")
+        assert self.engine.client.futures_orderbook_askbids_history.call_count == 3
+        assert self.engine.client.funding_rate.call_count == 2
+    
+    def test_failed_fetch_is_not_cached(self):
+        self.engine.client.funding_rate.side_effect = [RuntimeError("down"), {"data": []}]
+        
+        assert self.engine.analyze_sniper_signals("BTC")["signal"] == "ERROR"
+        assert self.engine.analyze_sniper_signals("BTC")["signal"] != "ERROR"
+    
+    def test_error_and_fallback_bodies_are_not_cached(self):
+        fallback = {"data": [{"value": 0, "source": "minimal_fallback"}], "success": True, "fallback": True}
+        self.engine.client.funding_rate.side_effect = [{"code": "50001", "msg": "rate limited"}, fallback,
+                                                       {"data": [{"funding_rate": 0.0001}]}]
+        
+        for _ in range(4):
+            self.engine.analyze_sniper_signals("BTC")
+        
+        assert self.engine.client.funding_rate.call_count == 3
+    
+    def test_multi_coin_scan_analyses_coins_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        response = self.engine.client.taker_buysell_volume.return_value
+        
+        def taker_buysell_volume(*args):
+            barrier.wait()  # only returns once all three coins are fetching at the same time
+            return response
+        
+        self.engine.client.taker_buysell_volume.side_effect = taker_buysell_volume
+        
+        results = self.engine.multi_coin_scan(["BTC", "ETH", "SOL"])
+        
+        assert sorted(r["coin"] for r in results) == ["BTC", "ETH", "SOL"]
+        assert all(r["signal"] == "LONG" for r in results)
+        assert self.engine.multi_coin_scan([]) == []
+    
+    def test_endpoints_fetched_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def wait_for_all(response):
+            def fetch(*args):
+                barrier.wait()  # only returns once all three endpoints are in flight
+                return response
+            return fetch
+        
+        for name in ("taker_buysell_volume", "funding_rate", "futures_orderbook_askbids_history"):
+            endpoint = getattr(self.engine.client, name)
+            endpoint.side_effect = wait_for_all(endpoint.return_value)
+        
+        assert self.engine.analyze_sniper_signals("BTC")["signal"] == "LONG"
+    
+    def test_get_sniper_timing_engine_is_singleton(self):
+        from app.core import sniper_engine
+        
+        sniper_engine.sniper_timing_engine = None
+        assert sniper_engine.get_sniper_timing_engine() is sniper_engine.get_sniper_timing_engine()
+        sniper_engine.sniper_timing_engine = None